@@ -0,0 +1,43 @@
+"""Add composite indexes for cost record and benchmark lookups
+
+Revision ID: 003
+Revises: 002_core_business_tables
+Create Date: 2026-10-15 09:00:00
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '003_cost_composite_indexes'
+down_revision = '002_core_business_tables'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # MySQL has no INCLUDE clause, so the summary columns are appended to the
+    # key to keep period-range aggregations index-only.
+    op.create_index(
+        'ix_cost_user_period',
+        'cost_records',
+        ['user_id', 'period_start', 'provider', 'service_type', 'region', 'cost_amount'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_cost_user_psr',
+        'cost_records',
+        ['user_id', 'provider', 'service_type', 'period_start'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_benchmark_lookup',
+        'benchmarks',
+        ['service_type', 'provider', 'user_id', 'is_active', 'valid_from', 'valid_until'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_benchmark_lookup', table_name='benchmarks')
+    op.drop_index('ix_cost_user_psr', table_name='cost_records')
+    op.drop_index('ix_cost_user_period', table_name='cost_records')
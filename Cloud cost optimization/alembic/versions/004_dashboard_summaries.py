@@ -0,0 +1,37 @@
+"""Create dashboard_summaries table for pre-aggregated dashboard figures
+
+Revision ID: 004
+Revises: 003_cost_composite_indexes
+Create Date: 2026-10-15 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004_dashboard_summaries'
+down_revision = '003_cost_composite_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # MySQL has no materialized views; this table is refreshed by Celery beat
+    op.create_table(
+        'dashboard_summaries',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('month_cost', sa.Numeric(precision=15, scale=6), nullable=False),
+        sa.Column('prev_month_cost', sa.Numeric(precision=15, scale=6), nullable=False),
+        sa.Column('resource_count', sa.Integer(), nullable=False),
+        sa.Column('classification_summary', sa.JSON(), nullable=False),
+        sa.Column('pending_decisions', sa.Integer(), nullable=False),
+        sa.Column('potential_savings', sa.Numeric(precision=15, scale=2), nullable=False),
+        sa.Column('active_providers', sa.JSON(), nullable=False),
+        sa.Column('refreshed_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('user_id'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('dashboard_summaries')
@@ -0,0 +1,51 @@
+"""Add composite indexes for dashboard queries
+
+Revision ID: 005
+Revises: 004_dashboard_summaries
+Create Date: 2026-10-15 11:00:00
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '005_dashboard_indexes'
+down_revision = '004_dashboard_summaries'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # InnoDB builds secondary indexes online, so no CONCURRENTLY equivalent
+    # is needed. There are no INCLUDE or partial indexes either, so covered
+    # columns are appended to the key and the NULL filters lead it.
+    op.drop_index('ix_cost_user_period', table_name='cost_records')
+    op.create_index(
+        'ix_cost_user_period_cost',
+        'cost_records',
+        ['user_id', 'period_start', 'provider', 'service_type', 'region', 'resource_id', 'cost_amount'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_decisions_user_pending',
+        'decisions',
+        ['user_id', 'dismissed_at', 'approved_at', 'estimated_savings_monthly'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_ingestion_user_created',
+        'ingestion_jobs',
+        ['user_id', 'created_at', 'status', 'file_size'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ingestion_user_created', table_name='ingestion_jobs')
+    op.drop_index('ix_decisions_user_pending', table_name='decisions')
+    op.drop_index('ix_cost_user_period_cost', table_name='cost_records')
+    op.create_index(
+        'ix_cost_user_period',
+        'cost_records',
+        ['user_id', 'period_start', 'provider', 'service_type', 'region', 'cost_amount'],
+        unique=False,
+    )
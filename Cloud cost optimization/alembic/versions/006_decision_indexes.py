@@ -0,0 +1,50 @@
+"""Add composite indexes for decision listing and statistics
+
+Revision ID: 006
+Revises: 005_dashboard_indexes
+Create Date: 2026-10-15 12:00:00
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '006_decision_indexes'
+down_revision = '005_dashboard_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The pending-decision index already exists (005); MySQL has no partial
+    # indexes, so the automated filter columns are part of the key instead
+    op.create_index(
+        'ix_decisions_user_created',
+        'decisions',
+        ['user_id', 'created_at'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_decisions_user_status',
+        'decisions',
+        ['user_id', 'webhook_status', 'created_at'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_decisions_user_action',
+        'decisions',
+        ['user_id', 'action_type', 'created_at'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_decisions_user_automated',
+        'decisions',
+        ['user_id', 'is_automated', 'executed_at'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_decisions_user_automated', table_name='decisions')
+    op.drop_index('ix_decisions_user_action', table_name='decisions')
+    op.drop_index('ix_decisions_user_status', table_name='decisions')
+    op.drop_index('ix_decisions_user_created', table_name='decisions')
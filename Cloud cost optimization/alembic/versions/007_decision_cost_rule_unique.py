@@ -0,0 +1,36 @@
+"""Add unique constraint on decisions (cost_record_id, rule_id)
+
+Revision ID: 007
+Revises: 006_decision_indexes
+Create Date: 2026-10-15 13:00:00
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '007_decision_cost_rule_unique'
+down_revision = '006_decision_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keep the oldest decision when a rule fired more than once for a cost record
+    op.execute(
+        """
+        DELETE newer FROM decisions AS newer
+        JOIN decisions AS older
+            ON newer.cost_record_id = older.cost_record_id
+            AND newer.rule_id = older.rule_id
+            AND newer.id > older.id
+        """
+    )
+    op.create_unique_constraint(
+        'uq_decisions_cost_rule',
+        'decisions',
+        ['cost_record_id', 'rule_id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_decisions_cost_rule', 'decisions', type_='unique')
@@ -0,0 +1,35 @@
+"""Add check constraints on decisions
+
+Revision ID: 008
+Revises: 007_decision_cost_rule_unique
+Create Date: 2026-10-15 14:00:00
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '008_decision_check_constraints'
+down_revision = '007_decision_cost_rule_unique'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_check_constraint(
+        'ck_decisions_confidence',
+        'decisions',
+        'confidence >= 0 AND confidence <= 1',
+    )
+    op.create_check_constraint(
+        'ck_decisions_webhook_attempts',
+        'decisions',
+        'webhook_attempts >= 0',
+    )
+    # Refresh index statistics so the optimizer costs the pending/automated
+    # indexes against current data
+    op.execute('ANALYZE TABLE decisions')
+
+
+def downgrade() -> None:
+    op.drop_constraint('ck_decisions_webhook_attempts', 'decisions', type_='check')
+    op.drop_constraint('ck_decisions_confidence', 'decisions', type_='check')
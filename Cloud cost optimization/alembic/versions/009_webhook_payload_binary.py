@@ -0,0 +1,36 @@
+"""Store webhook request payloads as raw bytes
+
+Revision ID: 009
+Revises: 008_decision_check_constraints
+Create Date: 2026-10-15 15:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009_webhook_payload_binary'
+down_revision = '008_decision_check_constraints'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # TEXT -> BLOB keeps the stored UTF-8 bytes as they are
+    op.alter_column(
+        'webhook_logs',
+        'request_payload',
+        existing_type=sa.Text(),
+        type_=sa.LargeBinary(),
+        existing_nullable=False,
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        'webhook_logs',
+        'request_payload',
+        existing_type=sa.LargeBinary(),
+        type_=sa.Text(),
+        existing_nullable=False,
+    )
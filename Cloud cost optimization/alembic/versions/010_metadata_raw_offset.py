@@ -0,0 +1,132 @@
+"""Replace metadata raw_data JSON with an offset into a Parquet shard
+
+Revision ID: 010
+Revises: 009_webhook_payload_binary
+Create Date: 2026-10-15 16:00:00
+
+"""
+import json
+import os
+
+from alembic import op
+import pyarrow as pa
+import pyarrow.parquet as pq
+import sqlalchemy as sa
+
+from app.core.config import settings
+
+# revision identifiers, used by Alembic.
+revision = '010_metadata_raw_offset'
+down_revision = '009_webhook_payload_binary'
+branch_labels = None
+depends_on = None
+
+# Rows per row group in a backfilled shard, as the collector writes them
+RAW_ROW_GROUP_SIZE = 64 * 1024
+
+metadata_records = sa.table(
+    'metadata_records',
+    sa.column('id', sa.Integer),
+    sa.column('ingestion_job_id', sa.Integer),
+    sa.column('source_path', sa.String),
+    sa.column('raw_data', sa.JSON),
+    sa.column('raw_offset', sa.Integer),
+)
+
+
+def _shard_path(job_id: int) -> str:
+    return os.path.join(settings.UPLOAD_DIR, 'raw', f'job_{job_id}.parquet')
+
+
+def _shard_value(value):
+    # Shards hold strings, as read from the CSV; csv.DictReader overflow lists are kept as JSON
+    return value if value is None or isinstance(value, str) else json.dumps(value)
+
+
+def upgrade() -> None:
+    op.add_column('metadata_records', sa.Column('raw_offset', sa.Integer(), nullable=True))
+
+    # Source rows now live in per-job Parquet shards under UPLOAD_DIR/raw;
+    # move each job's stored rows into its shard before dropping the column
+    bind = op.get_bind()
+    job_ids = bind.execute(
+        sa.select(metadata_records.c.ingestion_job_id)
+        .where(metadata_records.c.raw_data.is_not(None))
+        .distinct()
+    ).scalars().all()
+
+    for job_id in job_ids:
+        rows = bind.execute(
+            sa.select(metadata_records.c.id, metadata_records.c.raw_data)
+            .where(
+                metadata_records.c.ingestion_job_id == job_id,
+                metadata_records.c.raw_data.is_not(None),
+            )
+            .order_by(metadata_records.c.id)
+        ).all()
+
+        names = list(dict.fromkeys(str(key) for row in rows for key in row.raw_data))
+        shard = pa.table(
+            {
+                name: pa.array([_shard_value(row.raw_data.get(name)) for row in rows], pa.string())
+                for name in names
+            }
+        )
+        path = _shard_path(job_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        pq.write_table(shard, path, row_group_size=RAW_ROW_GROUP_SIZE)
+
+        bind.execute(
+            metadata_records.update()
+            .where(metadata_records.c.id == sa.bindparam('record_id'))
+            .values(source_path=path, raw_offset=sa.bindparam('offset')),
+            [{'record_id': row.id, 'offset': offset} for offset, row in enumerate(rows)],
+        )
+
+    op.drop_column('metadata_records', 'raw_data')
+
+
+def downgrade() -> None:
+    op.add_column('metadata_records', sa.Column('raw_data', sa.JSON(), nullable=True))
+
+    # Read each record's row back out of its job's shard
+    bind = op.get_bind()
+    shard_paths = bind.execute(
+        sa.select(metadata_records.c.source_path)
+        .where(metadata_records.c.raw_offset.is_not(None))
+        .distinct()
+    ).scalars().all()
+
+    for path in shard_paths:
+        if not os.path.exists(path):
+            continue
+        shard_rows = pq.read_table(path).to_pylist()
+        records = bind.execute(
+            sa.select(
+                metadata_records.c.id,
+                metadata_records.c.ingestion_job_id,
+                metadata_records.c.raw_offset,
+            )
+            .where(
+                metadata_records.c.source_path == path,
+                metadata_records.c.raw_offset.is_not(None),
+            )
+        ).all()
+        restored = [
+            {
+                'record_id': record.id,
+                'row': shard_rows[record.raw_offset],
+                'job_path': f'job_{record.ingestion_job_id}',
+            }
+            for record in records
+            if record.raw_offset < len(shard_rows)
+        ]
+        if restored:
+            bind.execute(
+                metadata_records.update()
+                .where(metadata_records.c.id == sa.bindparam('record_id'))
+                .values(raw_data=sa.bindparam('row'), source_path=sa.bindparam('job_path')),
+                restored,
+            )
+
+    op.drop_column('metadata_records', 'raw_offset')
@@ -42,21 +42,34 @@ class Settings(BaseSettings):
     # File Upload
     UPLOAD_DIR: str = "./uploads"
     MAX_UPLOAD_SIZE_MB: int = 100
+    USE_MMAP_CSV: bool = True
+    MMAP_CSV_MIN_SIZE_MB: int = 64
+    METADATA_STORE_RAW_ROWS: bool = True
     
     # Celery
     CELERY_BROKER_URL: str
     CELERY_RESULT_BACKEND: str
     CELERY_TASK_ALWAYS_EAGER: bool = False
+    CELERY_PREFETCH_MULTIPLIER: int = 4
     
     # Webhooks
     WEBHOOK_TIMEOUT_SECONDS: int = 30
     WEBHOOK_MAX_RETRIES: int = 5
     WEBHOOK_RETRY_BACKOFF_BASE: int = 2
     WEBHOOK_SECRET_HEADER: str = "X-Webhook-Signature"
+    WEBHOOK_MAX_CONCURRENCY: int = 32
+    WEBHOOK_MAX_CONNECTIONS: int = 100
+    WEBHOOK_MAX_KEEPALIVE_CONNECTIONS: int = 50
     
     # Data Retention
     DATA_RETENTION_DAYS: int = 90
     
+    # Dashboard
+    DASHBOARD_SUMMARY_REFRESH_SECONDS: int = 300
+    DASHBOARD_SUMMARY_MAX_AGE_SECONDS: int = 600
+    DASHBOARD_CACHE_TTL_SECONDS: int = 60
+    DASHBOARD_CACHE_REFRESH_AHEAD_SECONDS: int = 10
+    
     # Logging
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "json"  # "json" or "console"
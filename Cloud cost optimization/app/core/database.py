@@ -1,10 +1,19 @@
 """Database configuration and session management."""
 
+from collections.abc import Awaitable, Callable
+
+import orjson
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base
 
 from app.core.config import settings
 
+
+def _json_serializer(value) -> str:
+    """Serialize JSON columns with orjson; non-string keys are stringified as json.dumps does."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
@@ -13,8 +22,33 @@ engine = create_async_engine(
     pool_size=20,
     max_overflow=10,
     pool_pre_ping=True,
+    query_cache_size=1200,  # Compiled-statement cache entries (default 500)
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
 )
 
+# Connection info key set while a connection may hold MySQL named locks
+NAMED_LOCKS_KEY = "named_locks"
+
+
+@event.listens_for(engine.sync_engine, "reset")
+def _release_named_locks(dbapi_connection, connection_record, reset_state) -> None:
+    """
+    Release named locks a connection still holds before it returns to the pool.
+    
+    GET_LOCK locks belong to the connection and survive ROLLBACK, so a session
+    that failed before releasing them would otherwise pool them too.
+    """
+    if not connection_record.info.pop(NAMED_LOCKS_KEY, False):
+        return
+    if reset_state.terminate_only or not reset_state.asyncio_safe:
+        return  # The connection is being closed, which releases its locks
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("SELECT RELEASE_ALL_LOCKS()")
+    finally:
+        cursor.close()
+
 # Session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -26,15 +60,36 @@ AsyncSessionLocal = async_sessionmaker(
 # Base class for declarative models
 Base = declarative_base()
 
+# session.info key of the callbacks waiting for the session to commit
+AFTER_COMMIT_KEY = "after_commit"
+
+
+def run_after_commit(session: AsyncSession, callback: Callable[[], Awaitable[None]]) -> None:
+    """Queue an async callback to run once the session's changes are committed."""
+    session.info.setdefault(AFTER_COMMIT_KEY, []).append(callback)
+
+
+async def commit_session(session: AsyncSession) -> None:
+    """Commit the session, then run the callbacks queued for after the commit."""
+    await session.commit()
+    for callback in session.info.pop(AFTER_COMMIT_KEY, []):
+        await callback()
+
+
+async def rollback_session(session: AsyncSession) -> None:
+    """Roll back the session, dropping the callbacks queued for after a commit."""
+    session.info.pop(AFTER_COMMIT_KEY, None)
+    await session.rollback()
+
 
 async def get_db():
     """Dependency to get database session."""
     async with AsyncSessionLocal() as session:
         try:
             yield session
-            await session.commit()
+            await commit_session(session)
         except Exception:
-            await session.rollback()
+            await rollback_session(session)
             raise
         finally:
             await session.close()
@@ -0,0 +1,25 @@
+"""Persistent event loop for running async code from Celery tasks."""
+
+import asyncio
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+# One loop per worker process, so pooled database and HTTP connections
+# opened by one task are still usable by the next
+_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_worker_loop() -> asyncio.AbstractEventLoop:
+    """Get or create this process's event loop."""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop
+
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine to completion on the worker's persistent event loop."""
+    return get_worker_loop().run_until_complete(coro)
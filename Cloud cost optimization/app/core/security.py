@@ -1,18 +1,56 @@
 """Security utilities: JWT handling, password hashing, API key generation."""
 
+import hashlib
 import hmac
 import secrets
+import ssl
+import time
 from datetime import datetime, timedelta, timezone
 
+import structlog
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
 from app.core.exceptions import AuthenticationError
 
+logger = structlog.get_logger()
+
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# SHA-256 throughput below this (MB/s) suggests no SHA extensions (SHA-NI)
+SHA256_MIN_THROUGHPUT_MBPS = 700
+SHA256_PROBE_BYTES = 8 * 1024 * 1024
+
+
+def check_sha256_backend() -> dict:
+    """
+    Log which SHA-256 implementation backs webhook signing and file checksums.
+    
+    OpenSSL 1.1+ uses the CPU's SHA extensions where available; a slow probe
+    or a non-OpenSSL build is reported as a warning.
+    """
+    probe = bytes(SHA256_PROBE_BYTES)
+    start = time.perf_counter()
+    hashlib.sha256(probe).digest()
+    elapsed = time.perf_counter() - start
+    
+    backend = {
+        'openssl_version': ssl.OPENSSL_VERSION,
+        'openssl_backed': hashlib.sha256.__name__ == 'openssl_sha256',
+        'throughput_mbps': round(SHA256_PROBE_BYTES / (1024 * 1024) / max(elapsed, 1e-9)),
+    }
+    if (
+        not backend['openssl_backed']
+        or ssl.OPENSSL_VERSION_INFO < (1, 1, 0)
+        or backend['throughput_mbps'] < SHA256_MIN_THROUGHPUT_MBPS
+    ):
+        logger.warning("SHA-256 is not hardware accelerated", **backend)
+    else:
+        logger.info("SHA-256 backend", **backend)
+    return backend
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
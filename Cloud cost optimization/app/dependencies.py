@@ -1,5 +1,7 @@
 """FastAPI dependencies for database, Redis, and authentication."""
 
+from datetime import datetime, timezone
+
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -103,7 +105,13 @@ async def get_current_user_or_api_key(
     return user
 
 
+def get_request_time() -> datetime:
+    """Return the UTC timestamp shared by all time-window calculations in a request."""
+    return datetime.now(timezone.utc)
+
+
 # Common dependencies
 DBDependency = Depends(get_db)
 RedisDependency = Depends(get_redis)
 CurrentUserDependency = Depends(get_current_user_or_api_key)
+RequestTimeDependency = Depends(get_request_time)
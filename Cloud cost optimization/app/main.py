@@ -4,6 +4,7 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
@@ -12,12 +13,14 @@ from app.core.config import settings
 from app.core.constants import API_V1_PREFIX
 from app.core.error_handlers import add_exception_handlers
 from app.core.logging import configure_logging
+from app.core.security import check_sha256_backend
 from app.modules.auth.router import limiter as auth_limiter
 from app.modules.auth.router import router as auth_router
 from app.modules.classification.router import router as classification_router
 from app.modules.cost.router import router as cost_router
 from app.modules.dashboard.router import router as dashboard_router
 from app.modules.decisions.router import router as decisions_router
+from app.modules.decisions.webhooks import close_webhook_deliverer
 from app.modules.ingestion.router import router as ingestion_router
 
 
@@ -26,11 +29,12 @@ async def lifespan(app: FastAPI):
     """Application lifespan events: startup and shutdown."""
     # Startup: Initialize logging, connections, etc.
     configure_logging()
+    check_sha256_backend()
     
     yield
     
     # Shutdown: Cleanup resources
-    pass
+    await close_webhook_deliverer()
 
 
 def create_application() -> FastAPI:
@@ -42,6 +46,7 @@ def create_application() -> FastAPI:
         docs_url="/docs" if settings.DEBUG else None,
         redoc_url="/redoc" if settings.DEBUG else None,
         lifespan=lifespan,
+        default_response_class=ORJSONResponse,
     )
     
     # CORS middleware (restrict in production)
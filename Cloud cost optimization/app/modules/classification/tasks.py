@@ -3,6 +3,7 @@
 from celery import shared_task
 
 from app.core.database import AsyncSessionLocal
+from app.core.event_loop import run_async
 from app.modules.classification.service import ClassificationService
 
 
@@ -30,9 +31,8 @@ def process_classification_batch(
             result = await service.classify_batch(user_id, job_id, limit)
             return result
     
-    import asyncio
     try:
-        return asyncio.run(_process())
+        return run_async(_process())
     except Exception as exc:
         # Retry on transient failures
         try:
@@ -75,5 +75,4 @@ def auto_classify_new_ingestion(ingestion_job_id: int) -> dict:
                 'classification_result': result,
             }
     
-    import asyncio
-    return asyncio.run(_classify())
+    return run_async(_classify())
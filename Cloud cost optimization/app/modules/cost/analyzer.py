@@ -6,6 +6,14 @@ from typing import Any
 
 from app.modules.cost.models import Benchmark, CostRecord
 
+# Period key formats per trend granularity; the codes mean the same in
+# strftime and MySQL DATE_FORMAT (%U = Sunday-based week number)
+TREND_PERIOD_FORMATS = {
+    'daily': '%Y-%m-%d',
+    'weekly': '%Y-W%U',
+    'monthly': '%Y-%m',
+}
+
 
 class CostAnalyzer:
     """Analyzes costs and compares against benchmarks."""
@@ -87,6 +95,7 @@ class CostAnalyzer:
         self,
         cost_records: list[CostRecord],
         threshold_pct: Decimal = Decimal('50'),
+        now: datetime | None = None,
     ) -> list[dict]:
         """
         Detect cost anomalies based on statistical analysis.
@@ -97,6 +106,8 @@ class CostAnalyzer:
         if not cost_records:
             return []
         
+        detected_at = now or datetime.now(timezone.utc)
+        
         # Group by service type
         by_service: dict[str, list[CostRecord]] = {}
         for record in cost_records:
@@ -142,7 +153,7 @@ class CostAnalyzer:
                     anomalies.append({
                         'resource_id': record.resource_id,
                         'service_type': record.service_type,
-                        'detected_at': datetime.now(timezone.utc),
+                        'detected_at': detected_at,
                         'expected_cost': avg_cost * record.usage_quantity,
                         'actual_cost': record.cost_amount,
                         'variance_pct': variance_pct,
@@ -151,106 +162,69 @@ class CostAnalyzer:
         
         return anomalies
     
-    def calculate_trends(
+    def add_group_to_trends(
         self,
-        cost_records: list[CostRecord],
-        granularity: str = 'monthly',
-    ) -> list[dict]:
-        """
-        Calculate cost trends over time.
-        
-        Args:
-            cost_records: List of cost records
-            granularity: 'daily', 'weekly', 'monthly'
-        """
-        if not cost_records:
-            return []
-        
-        # Group by period
-        periods: dict[str, list[CostRecord]] = {}
-        
-        for record in cost_records:
-            if granularity == 'daily':
-                period_key = record.period_start.strftime('%Y-%m-%d')
-            elif granularity == 'weekly':
-                period_key = record.period_start.strftime('%Y-W%U')
-            else:  # monthly
-                period_key = record.period_start.strftime('%Y-%m')
-            
-            if period_key not in periods:
-                periods[period_key] = []
-            periods[period_key].append(record)
+        periods: dict[str, dict],
+        period_key: str,
+        provider: str,
+        service_type: str,
+        cost: Decimal,
+        record_count: int = 1,
+    ) -> None:
+        """Fold a pre-aggregated (period, provider, service) group into running totals."""
+        bucket = periods.get(period_key)
+        if bucket is None:
+            bucket = periods[period_key] = {
+                'total_cost': Decimal('0'),
+                'record_count': 0,
+                'by_provider': {},
+                'by_service': {},
+            }
         
-        # Calculate summary for each period
+        bucket['total_cost'] += cost
+        bucket['record_count'] += record_count
+        by_provider = bucket['by_provider']
+        by_service = bucket['by_service']
+        by_provider[provider] = by_provider.get(provider, Decimal('0')) + cost
+        by_service[service_type] = by_service.get(service_type, Decimal('0')) + cost
+    
+    def summarize_trends(self, periods: dict[str, dict]) -> list[dict]:
+        """Turn running per-period totals into sorted trend data points."""
         trends = []
         for period_key in sorted(periods.keys()):
-            records = periods[period_key]
-            
-            total_cost = sum(r.cost_amount for r in records)
-            
-            by_provider: dict[str, Decimal] = {}
-            by_service: dict[str, Decimal] = {}
-            
-            for r in records:
-                by_provider[r.provider] = by_provider.get(r.provider, Decimal('0')) + r.cost_amount
-                by_service[r.service_type] = by_service.get(r.service_type, Decimal('0')) + r.cost_amount
-            
+            bucket = periods[period_key]
             trends.append({
                 'period': period_key,
-                'total_cost': total_cost,
-                'record_count': len(records),
-                'by_provider': {k: float(v) for k, v in by_provider.items()},
-                'by_service': {k: float(v) for k, v in by_service.items()},
+                'total_cost': bucket['total_cost'],
+                'record_count': bucket['record_count'],
+                'by_provider': {k: float(v) for k, v in bucket['by_provider'].items()},
+                'by_service': {k: float(v) for k, v in bucket['by_service'].items()},
             })
         
         return trends
     
-    def find_savings_opportunities(
+    def build_savings_opportunity(
         self,
-        cost_records: list[CostRecord],
-        benchmarks: list[Benchmark],
-    ) -> list[dict]:
-        """
-        Identify potential savings opportunities.
-        
-        Compares costs against benchmarks and identifies over-provisioned
-        or underutilized resources.
-        """
-        opportunities = []
-        
-        # Create lookup for benchmarks
-        benchmark_lookup: dict[tuple, Benchmark] = {}
-        for b in benchmarks:
-            key = (b.service_type, b.provider, b.region)
-            benchmark_lookup[key] = b
-        
-        for record in cost_records:
-            # Find matching benchmark
-            key = (record.service_type, record.provider, record.region)
-            benchmark = benchmark_lookup.get(key)
-            
-            if not benchmark:
-                continue
-            
-            comparison = self.compare_to_benchmark(record, benchmark)
-            
-            if comparison['potential_savings'] and comparison['potential_savings'] > 0:
-                opportunities.append({
-                    'resource_id': record.resource_id,
-                    'service_type': record.service_type,
-                    'current_monthly_cost': record.cost_amount,
-                    'potential_savings': comparison['potential_savings'],
-                    'savings_pct': comparison['variance_pct'],
-                    'recommendation': self._generate_recommendation(
-                        record.service_type,
-                        comparison['comparison_status']
-                    ),
-                })
-        
-        # Sort by potential savings (highest first)
-        opportunities.sort(key=lambda x: x['potential_savings'], reverse=True)
+        resource_id: str,
+        service_type: str,
+        cost_amount: Decimal,
+        usage_quantity: Decimal,
+        benchmark_avg: Decimal,
+        potential_savings: Decimal,
+    ) -> dict:
+        """Describe a pre-ranked savings opportunity (see CostRepository.top_savings_opportunities)."""
+        unit_cost = self.calculate_unit_cost(cost_amount, usage_quantity)
+        variance_pct = (unit_cost - benchmark_avg) / benchmark_avg * 100
+        status = 'above_average' if unit_cost <= benchmark_avg * Decimal('1.2') else 'high'
         
-        return opportunities
+        return {
+            'resource_id': resource_id,
+            'service_type': service_type,
+            'current_monthly_cost': cost_amount,
+            'potential_savings': potential_savings,
+            'savings_pct': variance_pct,
+            'recommendation': self._generate_recommendation(service_type, status),
+        }
     
     def _generate_recommendation(self, service_type: str, status: str) -> str:
         """Generate a recommendation based on service type and status."""
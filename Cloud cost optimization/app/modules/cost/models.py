@@ -3,7 +3,7 @@
 from datetime import datetime, timezone
 from decimal import Decimal
 
-from sqlalchemy import DateTime, ForeignKey, Integer, Numeric, String, Text
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, Numeric, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.constants import CloudProvider
@@ -14,6 +14,20 @@ class CostRecord(Base):
     """Individual cost records from billing data."""
     
     __tablename__ = "cost_records"
+    __table_args__ = (
+        # Period-range scans; trailing columns let summaries be served from the index
+        Index(
+            "ix_cost_user_period_cost",
+            "user_id",
+            "period_start",
+            "provider",
+            "service_type",
+            "region",
+            "resource_id",
+            "cost_amount",
+        ),
+        Index("ix_cost_user_psr", "user_id", "provider", "service_type", "period_start"),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     # References
@@ -76,6 +90,17 @@ class Benchmark(Base):
     """Cost benchmarks for comparison."""
     
     __tablename__ = "benchmarks"
+    __table_args__ = (
+        Index(
+            "ix_benchmark_lookup",
+            "service_type",
+            "provider",
+            "user_id",
+            "is_active",
+            "valid_from",
+            "valid_until",
+        ),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int | None] = mapped_column(
@@ -1,11 +1,12 @@
 """Database access layer for cost operations."""
 
-from datetime import datetime
+from datetime import datetime, timezone
 from decimal import Decimal
 
-from sqlalchemy import func, select
+from sqlalchemy import Row, Select, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.modules.classification.models import ClassificationResult
 from app.modules.cost.models import Benchmark, CostRecord
 
 
@@ -25,6 +26,29 @@ class CostRepository:
         )
         return result.scalar_one_or_none()
     
+    async def get_with_classification(
+        self,
+        cost_id: int,
+        user_id: int,
+    ) -> tuple[CostRecord | None, ClassificationResult | None]:
+        """Get a cost record and its metadata's classification in one query."""
+        result = await self.db.execute(
+            select(CostRecord, ClassificationResult)
+            .outerjoin(
+                ClassificationResult,
+                (ClassificationResult.metadata_record_id == CostRecord.metadata_record_id)
+                & (ClassificationResult.user_id == user_id),
+            )
+            .where(
+                CostRecord.id == cost_id,
+                CostRecord.user_id == user_id
+            )
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None, None
+        return row[0], row[1]
+    
     async def list_by_job(
         self,
         job_id: int,
@@ -56,6 +80,24 @@ class CostRepository:
         offset: int = 0
     ) -> list[CostRecord]:
         """List cost records with filters."""
+        query = self._filtered_query(user_id, provider, service_type, start_date, end_date)
+        
+        result = await self.db.execute(
+            query.order_by(CostRecord.period_start.desc())
+            .limit(limit)
+            .offset(offset)
+        )
+        return list(result.scalars().all())
+    
+    def _filtered_query(
+        self,
+        user_id: int,
+        provider: str | None,
+        service_type: str | None,
+        start_date: datetime | None,
+        end_date: datetime | None,
+    ) -> Select:
+        """Build the base cost record query for the common filters."""
         query = select(CostRecord).where(CostRecord.user_id == user_id)
         
         if provider:
@@ -67,12 +109,7 @@ class CostRepository:
         if end_date:
             query = query.where(CostRecord.period_end <= end_date)
         
-        result = await self.db.execute(
-            query.order_by(CostRecord.period_start.desc())
-            .limit(limit)
-            .offset(offset)
-        )
-        return list(result.scalars().all())
+        return query
     
     async def create(self, cost_record: CostRecord) -> CostRecord:
         """Create a new cost record."""
@@ -88,34 +125,37 @@ class CostRepository:
         end_date: datetime | None = None,
     ) -> dict:
         """Get cost summary grouped by provider, service, and region."""
-        query = select(CostRecord).where(CostRecord.user_id == user_id)
+        # Only the grouped columns are fetched, streamed in batches, so neither
+        # ORM instances nor the full result set are held in memory
+        query = select(
+            CostRecord.provider,
+            CostRecord.service_type,
+            CostRecord.region,
+            CostRecord.cost_amount,
+            CostRecord.currency,
+        ).where(CostRecord.user_id == user_id)
         
         if start_date:
             query = query.where(CostRecord.period_start >= start_date)
         if end_date:
             query = query.where(CostRecord.period_end <= end_date)
         
-        result = await self.db.execute(query)
-        records = result.scalars().all()
-        
-        if not records:
-            return {
-                'total_cost': Decimal('0'),
-                'currency': 'USD',
-                'by_provider': {},
-                'by_service': {},
-                'by_region': {},
-                'record_count': 0,
-            }
+        result = await self.db.stream(query.execution_options(yield_per=1000))
         
-        total = sum(r.cost_amount for r in records)
-        currency = records[0].currency if records else 'USD'
+        total = Decimal('0')
+        currency = None
+        record_count = 0
         
         by_provider: dict[str, Decimal] = {}
         by_service: dict[str, Decimal] = {}
         by_region: dict[str, Decimal] = {}
         
-        for r in records:
+        # Single pass: the total is folded in with the per-dimension sums
+        async for r in result:
+            if currency is None:
+                currency = r.currency
+            record_count += 1
+            total += r.cost_amount
             by_provider[r.provider] = by_provider.get(r.provider, Decimal('0')) + r.cost_amount
             by_service[r.service_type] = by_service.get(r.service_type, Decimal('0')) + r.cost_amount
             region = r.region or 'unknown'
@@ -123,12 +163,106 @@ class CostRepository:
         
         return {
             'total_cost': total,
-            'currency': currency,
+            'currency': currency or 'USD',
             'by_provider': by_provider,
             'by_service': by_service,
             'by_region': by_region,
-            'record_count': len(records),
+            'record_count': record_count,
         }
+    
+    async def get_trend_groups(
+        self,
+        user_id: int,
+        period_format: str,
+        start_date: datetime,
+        end_date: datetime,
+    ) -> list[Row]:
+        """Sum cost and count records per (period, provider, service type)."""
+        period_key = func.date_format(CostRecord.period_start, period_format).label('period_key')
+        
+        result = await self.db.execute(
+            select(
+                period_key,
+                CostRecord.provider,
+                CostRecord.service_type,
+                func.sum(CostRecord.cost_amount).label('cost'),
+                func.count().label('record_count'),
+            )
+            .where(
+                CostRecord.user_id == user_id,
+                CostRecord.period_start >= start_date,
+                CostRecord.period_end <= end_date,
+            )
+            .group_by(period_key, CostRecord.provider, CostRecord.service_type)
+        )
+        return list(result.all())
+    
+    async def top_savings_opportunities(
+        self,
+        user_id: int,
+        start_date: datetime,
+        end_date: datetime,
+        now: datetime | None = None,
+        limit: int = 100,
+    ) -> list[Row]:
+        """
+        Rank cost records by potential savings against their best benchmark.
+        
+        The benchmark lookup mirrors BenchmarkRepository.find_matching and is
+        evaluated per record inside the query, so only the top `limit` rows
+        ever leave the database.
+        """
+        now = now or datetime.now(timezone.utc)
+        
+        benchmark_avg = (
+            select(Benchmark.avg_cost_per_unit)
+            .where(
+                (Benchmark.user_id == user_id) | (Benchmark.user_id == None),
+                Benchmark.service_type == CostRecord.service_type,
+                Benchmark.provider == CostRecord.provider,
+                (Benchmark.region == CostRecord.region) | (Benchmark.region == None),
+                Benchmark.is_active == True,
+                Benchmark.valid_from <= now,
+                (Benchmark.valid_until == None) | (Benchmark.valid_until >= now),
+            )
+            # User-specific first, then region-specific (MySQL has no NULLS LAST)
+            .order_by(Benchmark.user_id.is_(None), Benchmark.region.is_(None))
+            .limit(1)
+            .correlate(CostRecord)
+            .scalar_subquery()
+        )
+        
+        matched = (
+            select(
+                CostRecord.resource_id,
+                CostRecord.service_type,
+                CostRecord.cost_amount,
+                CostRecord.usage_quantity,
+                benchmark_avg.label('benchmark_avg'),
+            )
+            .where(
+                CostRecord.user_id == user_id,
+                CostRecord.period_start >= start_date,
+                CostRecord.period_end <= end_date,
+                CostRecord.usage_quantity > 0,
+            )
+            .subquery()
+        )
+        
+        potential_savings = (
+            matched.c.cost_amount - matched.c.benchmark_avg * matched.c.usage_quantity
+        ).label('potential_savings')
+        
+        result = await self.db.execute(
+            select(matched, potential_savings)
+            .where(
+                matched.c.benchmark_avg > 0,
+                potential_savings > 0,
+            )
+            .order_by(potential_savings.desc())
+            .limit(limit)
+        )
+        return list(result.all())
 
 
 class BenchmarkRepository:
@@ -149,11 +283,10 @@ class BenchmarkRepository:
         user_id: int,
         service_type: str | None = None,
         provider: str | None = None,
+        now: datetime | None = None,
     ) -> list[Benchmark]:
         """List available benchmarks (global or user-specific)."""
-        from datetime import datetime, timezone
-        
-        now = datetime.now(timezone.utc)
+        now = now or datetime.now(timezone.utc)
         
         query = select(Benchmark).where(
             (Benchmark.user_id == user_id) | (Benchmark.user_id == None),
@@ -176,11 +309,10 @@ class BenchmarkRepository:
         service_type: str,
         provider: str,
         region: str | None = None,
+        now: datetime | None = None,
     ) -> Benchmark | None:
         """Find best matching benchmark for criteria."""
-        from datetime import datetime, timezone
-        
-        now = datetime.now(timezone.utc)
+        now = now or datetime.now(timezone.utc)
         
         query = select(Benchmark).where(
             (Benchmark.user_id == user_id) | (Benchmark.user_id == None),
@@ -207,11 +339,18 @@ class BenchmarkRepository:
     
     async def create(self, benchmark: Benchmark) -> Benchmark:
         """Create a new benchmark."""
+        # All column defaults are Python-side, so the flushed instance is
+        # already complete and no refresh SELECT is needed.
         self.db.add(benchmark)
         await self.db.flush()
-        await self.db.refresh(benchmark)
         return benchmark
     
+    async def create_bulk(self, benchmarks: list[Benchmark]) -> list[Benchmark]:
+        """Create several benchmarks in a single flush."""
+        self.db.add_all(benchmarks)
+        await self.db.flush()
+        return benchmarks
+    
     async def delete(self, benchmark: Benchmark) -> None:
         """Delete a benchmark."""
         await self.db.delete(benchmark)
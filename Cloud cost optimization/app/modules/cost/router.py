@@ -1,10 +1,12 @@
 """Cost analysis API routes."""
 
+from datetime import datetime
+
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.dependencies import CurrentUserDependency
+from app.dependencies import CurrentUserDependency, RequestTimeDependency
 from app.modules.cost.schemas import (
     BenchmarkCreateRequest,
     BenchmarkResponse,
@@ -27,6 +29,7 @@ async def get_cost_records(
     limit: int = Query(default=100, ge=1, le=1000),
     offset: int = Query(default=0, ge=0),
     current_user: dict = CurrentUserDependency,
+    request_time: datetime = RequestTimeDependency,
     db: AsyncSession = Depends(get_db),
 ):
     """Get cost records with optional filtering."""
@@ -38,6 +41,7 @@ async def get_cost_records(
         months,
         limit,
         offset,
+        now=request_time,
     )
     return records
 
@@ -46,11 +50,12 @@ async def get_cost_records(
 async def get_cost_summary(
     months: int = Query(default=1, ge=1, le=12),
     current_user: dict = CurrentUserDependency,
+    request_time: datetime = RequestTimeDependency,
     db: AsyncSession = Depends(get_db),
 ):
     """Get summary of costs over a period."""
     service = CostService(db)
-    summary = await service.get_cost_summary(int(current_user["id"]), months)
+    summary = await service.get_cost_summary(int(current_user["id"]), months, now=request_time)
     return summary
 
 
@@ -59,11 +64,17 @@ async def get_cost_trends(
     months: int = Query(default=6, ge=1, le=24),
     granularity: str = Query(default="monthly", pattern="^(daily|weekly|monthly)$"),
     current_user: dict = CurrentUserDependency,
+    request_time: datetime = RequestTimeDependency,
     db: AsyncSession = Depends(get_db),
 ):
     """Get cost trends over time."""
     service = CostService(db)
-    trends = await service.get_cost_trends(int(current_user["id"]), months, granularity)
+    trends = await service.get_cost_trends(
+        int(current_user["id"]),
+        months,
+        granularity,
+        now=request_time,
+    )
     return trends
 
 
@@ -71,11 +82,12 @@ async def get_cost_trends(
 async def compare_costs(
     request: CostComparisonRequest,
     current_user: dict = CurrentUserDependency,
+    request_time: datetime = RequestTimeDependency,
     db: AsyncSession = Depends(get_db),
 ):
     """Compare costs against benchmarks."""
     service = CostService(db)
-    results = await service.compare_costs(int(current_user["id"]), request)
+    results = await service.compare_costs(int(current_user["id"]), request, now=request_time)
     return results
 
 
@@ -83,6 +95,7 @@ async def compare_costs(
 async def get_savings_opportunities(
     months: int = Query(default=1, ge=1, le=12),
     current_user: dict = CurrentUserDependency,
+    request_time: datetime = RequestTimeDependency,
     db: AsyncSession = Depends(get_db),
 ):
     """Find potential savings opportunities."""
@@ -90,6 +103,7 @@ async def get_savings_opportunities(
     opportunities = await service.find_savings_opportunities(
         int(current_user["id"]),
         months,
+        now=request_time,
     )
     return {
         'opportunities': opportunities,
@@ -102,6 +116,7 @@ async def get_savings_opportunities(
 async def detect_anomalies(
     threshold_pct: float = Query(default=50.0, ge=10.0, le=200.0),
     current_user: dict = CurrentUserDependency,
+    request_time: datetime = RequestTimeDependency,
     db: AsyncSession = Depends(get_db),
 ):
     """Detect cost anomalies."""
@@ -109,6 +124,7 @@ async def detect_anomalies(
     anomalies = await service.detect_anomalies(
         int(current_user["id"]),
         threshold_pct,
+        now=request_time,
     )
     return {
         'anomalies': anomalies,
@@ -135,6 +151,7 @@ async def list_benchmarks(
     service_type: str | None = None,
     provider: str | None = None,
     current_user: dict = CurrentUserDependency,
+    request_time: datetime = RequestTimeDependency,
     db: AsyncSession = Depends(get_db),
 ):
     """List available cost benchmarks."""
@@ -143,6 +160,7 @@ async def list_benchmarks(
         int(current_user["id"]),
         service_type,
         provider,
+        now=request_time,
     )
     return benchmarks
 
@@ -5,7 +5,7 @@ from datetime import datetime, timedelta, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import ResourceNotFoundError
-from app.modules.cost.analyzer import CostAnalyzer
+from app.modules.cost.analyzer import TREND_PERIOD_FORMATS, CostAnalyzer
 from app.modules.cost.models import Benchmark, CostRecord
 from app.modules.cost.repository import BenchmarkRepository, CostRepository
 from app.modules.cost.schemas import (
@@ -33,10 +33,11 @@ class CostService:
         service_type: str | None = None,
         months: int = 1,
         limit: int = 100,
-        offset: int = 0
+        offset: int = 0,
+        now: datetime | None = None,
     ) -> list[CostRecord]:
         """Get cost records with optional filtering."""
-        end_date = datetime.now(timezone.utc)
+        end_date = now or datetime.now(timezone.utc)
         start_date = end_date - timedelta(days=30 * months)
         
         return await self.cost_repo.list_by_user(
@@ -53,9 +54,10 @@ class CostService:
         self,
         user_id: int,
         months: int = 1,
+        now: datetime | None = None,
     ) -> CostSummaryResponse:
         """Get summary of costs over a period."""
-        end_date = datetime.now(timezone.utc)
+        end_date = now or datetime.now(timezone.utc)
         start_date = end_date - timedelta(days=30 * months)
         
         summary = await self.cost_repo.get_summary(user_id, start_date, end_date)
@@ -76,19 +78,28 @@ class CostService:
         user_id: int,
         months: int = 6,
         granularity: str = 'monthly',
+        now: datetime | None = None,
     ) -> CostTrendResponse:
         """Get cost trends over time."""
-        end_date = datetime.now(timezone.utc)
+        end_date = now or datetime.now(timezone.utc)
         start_date = end_date - timedelta(days=30 * months)
         
-        records = await self.cost_repo.list_by_user(
-            user_id,
-            start_date=start_date,
-            end_date=end_date,
-            limit=10000,
-        )
+        # Bucket and sum in SQL; only one row per (period, provider, service) comes back
+        period_format = TREND_PERIOD_FORMATS.get(granularity, TREND_PERIOD_FORMATS['monthly'])
+        groups = await self.cost_repo.get_trend_groups(user_id, period_format, start_date, end_date)
         
-        trends = self.analyzer.calculate_trends(records, granularity)
+        periods: dict[str, dict] = {}
+        for group in groups:
+            self.analyzer.add_group_to_trends(
+                periods,
+                group.period_key,
+                group.provider,
+                group.service_type,
+                group.cost,
+                group.record_count,
+            )
+        
+        trends = self.analyzer.summarize_trends(periods)
         
         return CostTrendResponse(
             period=granularity,
@@ -99,9 +110,10 @@ class CostService:
         self,
         user_id: int,
         request: CostComparisonRequest,
+        now: datetime | None = None,
     ) -> list[CostComparisonResult]:
         """Compare costs against benchmarks."""
-        end_date = datetime.now(timezone.utc)
+        end_date = now or datetime.now(timezone.utc)
         start_date = end_date - timedelta(days=30 * request.period_months)
         
         # Get cost records
@@ -128,6 +140,7 @@ class CostService:
                 record.service_type,
                 record.provider,
                 record.region,
+                now=end_date,
             )
             
             comparison = self.analyzer.compare_to_benchmark(record, benchmark)
@@ -157,41 +170,40 @@ class CostService:
         self,
         user_id: int,
         months: int = 1,
+        now: datetime | None = None,
     ) -> list[dict]:
         """Find potential savings opportunities."""
-        end_date = datetime.now(timezone.utc)
+        end_date = now or datetime.now(timezone.utc)
         start_date = end_date - timedelta(days=30 * months)
         
-        # Get cost records
-        records = await self.cost_repo.list_by_user(
+        # Matching, savings math and ranking all happen in SQL
+        rows = await self.cost_repo.top_savings_opportunities(
             user_id,
-            start_date=start_date,
-            end_date=end_date,
-            limit=1000,
+            start_date,
+            end_date,
+            now=end_date,
         )
         
-        # Get relevant benchmarks
-        service_types = list(set(r.service_type for r in records))
-        providers = list(set(r.provider for r in records))
-        
-        benchmarks = []
-        for service_type in service_types:
-            for provider in providers:
-                b = await self.benchmark_repo.find_matching(
-                    user_id, service_type, provider
-                )
-                if b:
-                    benchmarks.append(b)
-        
-        return self.analyzer.find_savings_opportunities(records, benchmarks)
+        return [
+            self.analyzer.build_savings_opportunity(
+                resource_id=row.resource_id,
+                service_type=row.service_type,
+                cost_amount=row.cost_amount,
+                usage_quantity=row.usage_quantity,
+                benchmark_avg=row.benchmark_avg,
+                potential_savings=row.potential_savings,
+            )
+            for row in rows
+        ]
     
     async def detect_anomalies(
         self,
         user_id: int,
         threshold_pct: float = 50.0,
+        now: datetime | None = None,
     ) -> list[dict]:
         """Detect cost anomalies."""
-        end_date = datetime.now(timezone.utc)
+        end_date = now or datetime.now(timezone.utc)
         start_date = end_date - timedelta(days=90)  # 3 months for baseline
         
         records = await self.cost_repo.list_by_user(
@@ -204,6 +216,7 @@ class CostService:
         return self.analyzer.detect_anomalies(
             records,
             threshold_pct=threshold_pct,
+            now=end_date,
         )
     
     # Benchmark management
@@ -236,12 +249,14 @@ class CostService:
         user_id: int,
         service_type: str | None = None,
         provider: str | None = None,
+        now: datetime | None = None,
     ) -> list[Benchmark]:
         """List available benchmarks."""
         return await self.benchmark_repo.list_available(
             user_id,
             service_type,
             provider,
+            now,
         )
     
     async def delete_benchmark(self, user_id: int, benchmark_id: int) -> None:
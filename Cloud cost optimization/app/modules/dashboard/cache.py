@@ -0,0 +1,121 @@
+"""Short-lived Redis cache for dashboard widget responses."""
+
+import asyncio
+import functools
+import inspect
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+import redis.asyncio as redis
+import structlog
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import run_after_commit
+from app.core.redis import get_redis
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+
+CACHE_PREFIX = "dash"
+
+# Keeps background refills alive until they finish
+_pending_refills: set[asyncio.Task] = set()
+
+
+def _cache_key(name: str, user_id: int, args: tuple, kwargs: dict) -> str:
+    """Build the cache key; `now` is excluded so requests within the TTL share entries."""
+    parts = [CACHE_PREFIX, str(user_id), name]
+    parts.extend(str(arg) for arg in args)
+    parts.extend(f"{k}={v}" for k, v in sorted(kwargs.items()) if k != 'now')
+    return ":".join(parts)
+
+
+def dashboard_cached(
+    ttl: int | None = None,
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """
+    Cache a DashboardService method per user in Redis.
+    
+    Entries close to expiry are served stale while a background task
+    recomputes them. Redis errors fall through to the wrapped method.
+    """
+    def decorator(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        adapter = TypeAdapter(inspect.signature(fn).return_annotation)
+        
+        async def refill(client: redis.Redis, key: str, expire: int, self, user_id, args, kwargs) -> T:
+            value = await fn(self, user_id, *args, **kwargs)
+            try:
+                await client.set(key, adapter.dump_json(value), ex=expire)
+            except redis.RedisError as exc:
+                logger.warning("Dashboard cache write failed", key=key, error=str(exc))
+            return value
+        
+        async def background_refill(client: redis.Redis, key: str, expire: int, self, user_id, args, kwargs) -> None:
+            try:
+                await refill(client, key, expire, self, user_id, args, kwargs)
+            except Exception as exc:
+                # The stale entry stays cached; the next caller near expiry retries
+                logger.warning("Dashboard cache refill failed", key=key, error=str(exc))
+        
+        @functools.wraps(fn)
+        async def wrapper(self, user_id: int, *args: Any, **kwargs: Any) -> T:
+            expire = ttl or settings.DASHBOARD_CACHE_TTL_SECONDS
+            key = _cache_key(fn.__name__, user_id, args, kwargs)
+            
+            try:
+                client = await get_redis()
+                async with client.pipeline(transaction=False) as pipe:
+                    cached, remaining = await pipe.get(key).ttl(key).execute()
+            except redis.RedisError as exc:
+                logger.warning("Dashboard cache read failed", key=key, error=str(exc))
+                return await fn(self, user_id, *args, **kwargs)
+            
+            if cached is None:
+                return await refill(client, key, expire, self, user_id, args, kwargs)
+            
+            # Stale-while-revalidate: one caller per key refreshes ahead of expiry
+            if 0 <= remaining < settings.DASHBOARD_CACHE_REFRESH_AHEAD_SECONDS:
+                try:
+                    claimed = await client.set(
+                        f"{key}:refill", 1, nx=True, ex=settings.DASHBOARD_CACHE_REFRESH_AHEAD_SECONDS
+                    )
+                except redis.RedisError:
+                    claimed = False
+                if claimed:
+                    # Recompute against the current time rather than the original request's
+                    fresh_kwargs = {k: v for k, v in kwargs.items() if k != 'now'}
+                    task = asyncio.create_task(
+                        background_refill(client, key, expire, self, user_id, args, fresh_kwargs)
+                    )
+                    _pending_refills.add(task)
+                    task.add_done_callback(_pending_refills.discard)
+            
+            return adapter.validate_json(cached)
+        
+        return wrapper
+    
+    return decorator
+
+
+async def invalidate_dashboard_cache(user_id: int) -> None:
+    """Drop every cached dashboard entry for a user after a write."""
+    try:
+        client = await get_redis()
+        keys = [key async for key in client.scan_iter(match=f"{CACHE_PREFIX}:{user_id}:*", count=100)]
+        if keys:
+            await client.delete(*keys)
+    except redis.RedisError as exc:
+        logger.warning("Dashboard cache invalidation failed", user_id=user_id, error=str(exc))
+
+
+def invalidate_dashboard_cache_on_commit(db: AsyncSession, user_id: int) -> None:
+    """
+    Invalidate a user's dashboard cache once db commits its pending writes.
+    
+    Invalidating before the commit would let a concurrent read re-cache
+    the data the write is about to replace.
+    """
+    run_after_commit(db, functools.partial(invalidate_dashboard_cache, user_id))
@@ -0,0 +1,34 @@
+"""Dashboard module database models."""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy import JSON, DateTime, ForeignKey, Integer, Numeric
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class DashboardSummary(Base):
+    """Pre-aggregated dashboard figures per user, refreshed periodically."""
+    
+    __tablename__ = "dashboard_summaries"
+    
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # Cost over the trailing 30 days and the 30 days before that
+    month_cost: Mapped[Decimal] = mapped_column(Numeric(15, 6), default=Decimal('0'), nullable=False)
+    prev_month_cost: Mapped[Decimal] = mapped_column(Numeric(15, 6), default=Decimal('0'), nullable=False)
+    resource_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    classification_summary: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    # {category: count}
+    pending_decisions: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    potential_savings: Mapped[Decimal] = mapped_column(Numeric(15, 2), default=Decimal('0'), nullable=False)
+    active_providers: Mapped[list] = mapped_column(JSON, nullable=False, default=list)
+    refreshed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
@@ -0,0 +1,147 @@
+"""Database access layer for dashboard summaries."""
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import case, func, select
+from sqlalchemy.dialects.mysql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.auth.models import User
+from app.modules.classification.models import ClassificationResult
+from app.modules.cost.models import CostRecord
+from app.modules.dashboard.models import DashboardSummary
+from app.modules.decisions.models import Decision
+from app.modules.metadata.models import MetadataRecord
+
+
+# Rows per INSERT ... ON DUPLICATE KEY UPDATE statement during a refresh
+REFRESH_BATCH_SIZE = 500
+
+
+class DashboardSummaryRepository:
+    """Repository for pre-aggregated dashboard summaries."""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get_by_user(self, user_id: int) -> DashboardSummary | None:
+        """Get the stored summary for a user."""
+        result = await self.db.execute(
+            select(DashboardSummary).where(DashboardSummary.user_id == user_id)
+        )
+        return result.scalar_one_or_none()
+    
+    async def refresh_all(self, now: datetime | None = None) -> int:
+        """
+        Recompute every user's summary with one grouped query per widget.
+        
+        Returns the number of summaries written.
+        """
+        now = now or datetime.now(timezone.utc)
+        start_date = now - timedelta(days=30)
+        prev_start = start_date - timedelta(days=30)
+        
+        user_ids = (await self.db.execute(select(User.id))).scalars().all()
+        if not user_ids:
+            return 0
+        
+        summaries: dict[int, dict] = {
+            user_id: {
+                'user_id': user_id,
+                'month_cost': Decimal('0'),
+                'prev_month_cost': Decimal('0'),
+                'resource_count': 0,
+                'classification_summary': {},
+                'pending_decisions': 0,
+                'potential_savings': Decimal('0'),
+                'active_providers': [],
+                'refreshed_at': now,
+            }
+            for user_id in user_ids
+        }
+        
+        # Current and previous 30-day cost windows in one scan
+        cost_rows = await self.db.execute(
+            select(
+                CostRecord.user_id,
+                func.sum(case(
+                    (
+                        (CostRecord.period_start >= start_date) & (CostRecord.period_end <= now),
+                        CostRecord.cost_amount,
+                    ),
+                )).label('month_cost'),
+                func.sum(case(
+                    (
+                        (CostRecord.period_start >= prev_start) & (CostRecord.period_end <= start_date),
+                        CostRecord.cost_amount,
+                    ),
+                )).label('prev_month_cost'),
+            )
+            .where(CostRecord.period_start >= prev_start)
+            .group_by(CostRecord.user_id)
+        )
+        for row in cost_rows.all():
+            if row.user_id in summaries:
+                summaries[row.user_id]['month_cost'] = row.month_cost or Decimal('0')
+                summaries[row.user_id]['prev_month_cost'] = row.prev_month_cost or Decimal('0')
+        
+        resource_rows = await self.db.execute(
+            select(MetadataRecord.user_id, func.count(MetadataRecord.id).label('count'))
+            .group_by(MetadataRecord.user_id)
+        )
+        for row in resource_rows.all():
+            if row.user_id in summaries:
+                summaries[row.user_id]['resource_count'] = row.count
+        
+        classification_rows = await self.db.execute(
+            select(
+                ClassificationResult.user_id,
+                ClassificationResult.category,
+                func.count(ClassificationResult.id).label('count'),
+            )
+            .group_by(ClassificationResult.user_id, ClassificationResult.category)
+        )
+        for row in classification_rows.all():
+            if row.user_id in summaries:
+                summaries[row.user_id]['classification_summary'][row.category] = row.count
+        
+        decision_rows = await self.db.execute(
+            select(
+                Decision.user_id,
+                func.count(case((Decision.approved_at == None, 1))).label('pending'),
+                func.sum(Decision.estimated_savings_monthly).label('savings'),
+            )
+            .where(Decision.dismissed_at == None)
+            .group_by(Decision.user_id)
+        )
+        for row in decision_rows.all():
+            if row.user_id in summaries:
+                summaries[row.user_id]['pending_decisions'] = row.pending or 0
+                summaries[row.user_id]['potential_savings'] = row.savings or Decimal('0')
+        
+        provider_rows = await self.db.execute(
+            select(CostRecord.user_id, CostRecord.provider).distinct()
+        )
+        for row in provider_rows.all():
+            if row.user_id in summaries:
+                summaries[row.user_id]['active_providers'].append(row.provider)
+        
+        values = list(summaries.values())
+        for offset in range(0, len(values), REFRESH_BATCH_SIZE):
+            stmt = insert(DashboardSummary).values(values[offset:offset + REFRESH_BATCH_SIZE])
+            await self.db.execute(
+                stmt.on_duplicate_key_update(
+                    month_cost=stmt.inserted.month_cost,
+                    prev_month_cost=stmt.inserted.prev_month_cost,
+                    resource_count=stmt.inserted.resource_count,
+                    classification_summary=stmt.inserted.classification_summary,
+                    pending_decisions=stmt.inserted.pending_decisions,
+                    potential_savings=stmt.inserted.potential_savings,
+                    active_providers=stmt.inserted.active_providers,
+                    refreshed_at=stmt.inserted.refreshed_at,
+                )
+            )
+        await self.db.flush()
+        
+        return len(values)
@@ -1,10 +1,12 @@
 """Dashboard API routes for aggregated data."""
 
+from datetime import datetime
+
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.dependencies import CurrentUserDependency
+from app.dependencies import CurrentUserDependency, RequestTimeDependency
 from app.modules.dashboard.schemas import (
     CostOverviewChart,
     DashboardAlertsResponse,
@@ -22,11 +24,12 @@ router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 @router.get("/summary", response_model=DashboardSummaryResponse)
 async def get_summary(
     current_user: dict = CurrentUserDependency,
+    request_time: datetime = RequestTimeDependency,
     db: AsyncSession = Depends(get_db),
 ):
     """Get high-level dashboard summary."""
     service = DashboardService(db)
-    summary = await service.get_summary(int(current_user["id"]))
+    summary = await service.get_summary(int(current_user["id"]), now=request_time)
     return summary
 
 
@@ -34,11 +37,12 @@ async def get_summary(
 async def get_cost_chart(
     months: int = 6,
     current_user: dict = CurrentUserDependency,
+    request_time: datetime = RequestTimeDependency,
     db: AsyncSession = Depends(get_db),
 ):
     """Get cost data formatted for chart visualization."""
     service = DashboardService(db)
-    chart = await service.get_cost_chart(int(current_user["id"]), months)
+    chart = await service.get_cost_chart(int(current_user["id"]), months, now=request_time)
     return chart
 
 
@@ -57,11 +61,12 @@ async def get_resource_breakdown(
 async def get_top_resources(
     limit: int = 10,
     current_user: dict = CurrentUserDependency,
+    request_time: datetime = RequestTimeDependency,
     db: AsyncSession = Depends(get_db),
 ):
     """Get top resources by cost."""
     service = DashboardService(db)
-    resources = await service.get_top_resources(int(current_user["id"]), limit)
+    resources = await service.get_top_resources(int(current_user["id"]), limit, now=request_time)
     return resources
 
 
@@ -79,20 +84,22 @@ async def get_recommendations(
 @router.get("/ingestion-status", response_model=IngestionStatusWidget)
 async def get_ingestion_status(
     current_user: dict = CurrentUserDependency,
+    request_time: datetime = RequestTimeDependency,
     db: AsyncSession = Depends(get_db),
 ):
     """Get recent ingestion job status."""
     service = DashboardService(db)
-    status = await service.get_ingestion_status(int(current_user["id"]))
+    status = await service.get_ingestion_status(int(current_user["id"]), now=request_time)
     return status
 
 
 @router.get("/alerts", response_model=DashboardAlertsResponse)
 async def get_alerts(
     current_user: dict = CurrentUserDependency,
+    request_time: datetime = RequestTimeDependency,
     db: AsyncSession = Depends(get_db),
 ):
     """Get active alerts for the dashboard."""
     service = DashboardService(db)
-    alerts = await service.get_alerts(int(current_user["id"]))
+    alerts = await service.get_alerts(int(current_user["id"]), now=request_time)
     return alerts
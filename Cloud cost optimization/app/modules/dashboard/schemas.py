@@ -15,6 +15,7 @@ class DashboardSummaryResponse(BaseModel):
     pending_decisions: int
     potential_savings: Decimal
     active_providers: list[str]
+    last_refreshed_at: datetime | None = None  # Set when served from the summary table
 
 
 class CostOverviewChart(BaseModel):
@@ -1,13 +1,19 @@
 """Business logic for dashboard data aggregation."""
 
+import asyncio
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 
-from sqlalchemy import func, select
-from sqlalchemy.ext.asyncio import AsyncSession
+import pandas as pd
+from sqlalchemy import Executable, Float, Numeric, Result, bindparam, case, func, literal, select, type_coerce, union_all
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
 from app.modules.classification.models import ClassificationResult
 from app.modules.cost.models import CostRecord
+from app.modules.dashboard.cache import dashboard_cached
+from app.modules.dashboard.models import DashboardSummary
 from app.modules.dashboard.schemas import (
     AlertItem,
     CostOverviewChart,
@@ -21,64 +27,136 @@ from app.modules.dashboard.schemas import (
 )
 from app.modules.decisions.models import Decision
 from app.modules.ingestion.models import IngestionJob
+from app.modules.metadata.models import MetadataRecord
+
+
+# Upper bound on concurrent dashboard queries (and pooled connections) per request
+MAX_CONCURRENT_QUERIES = 5
+
+# Month-over-month change (in percent) beyond which a resource is trending up/down
+TREND_THRESHOLD_PCT = 5.0
+
+# Summary widget statements are built once; per-request values are bound
+# parameters, so every call hits SQLAlchemy's compiled-statement cache
+_STMT_SUMMARY_SNAPSHOT = select(DashboardSummary).where(
+    DashboardSummary.user_id == bindparam('user_id')
+)
+_STMT_TOTAL_COST = select(func.sum(CostRecord.cost_amount)).where(
+    CostRecord.user_id == bindparam('user_id'),
+    CostRecord.period_start >= bindparam('start'),
+    CostRecord.period_end <= bindparam('end'),
+)
+_STMT_RESOURCE_COUNT = select(func.count(MetadataRecord.id)).where(
+    MetadataRecord.user_id == bindparam('user_id')
+)
+_STMT_CLASSIFICATION_SUMMARY = (
+    select(
+        ClassificationResult.category,
+        func.count(ClassificationResult.id).label('count')
+    )
+    .where(ClassificationResult.user_id == bindparam('user_id'))
+    .group_by(ClassificationResult.category)
+)
+_STMT_PENDING_DECISIONS = select(func.count(Decision.id)).where(
+    Decision.user_id == bindparam('user_id'),
+    Decision.approved_at == None,
+    Decision.dismissed_at == None,
+)
+_STMT_POTENTIAL_SAVINGS = select(func.sum(Decision.estimated_savings_monthly)).where(
+    Decision.user_id == bindparam('user_id'),
+    Decision.dismissed_at == None,
+)
+_STMT_ACTIVE_PROVIDERS = (
+    select(CostRecord.provider)
+    .where(CostRecord.user_id == bindparam('user_id'))
+    .distinct()
+)
 
 
 class DashboardService:
     """Service for aggregating dashboard data."""
     
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self,
+        db: AsyncSession,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    ):
         self.db = db
+        self.session_factory = session_factory
+        self._query_slots = asyncio.Semaphore(MAX_CONCURRENT_QUERIES)
     
-    async def get_summary(self, user_id: int) -> DashboardSummaryResponse:
+    async def get_summary(
+        self,
+        user_id: int,
+        now: datetime | None = None,
+    ) -> DashboardSummaryResponse:
         """Get high-level dashboard summary."""
-        end_date = datetime.now(timezone.utc)
+        end_date = now or datetime.now(timezone.utc)
+        
+        # Serve the periodically refreshed snapshot while it is fresh enough
+        snapshot = await self._get_summary_snapshot(user_id)
+        if snapshot:
+            # MySQL DATETIME comes back naive; the refresh task writes UTC
+            refreshed_at = snapshot.refreshed_at
+            if refreshed_at.tzinfo is None:
+                refreshed_at = refreshed_at.replace(tzinfo=timezone.utc)
+            
+            if end_date - refreshed_at <= timedelta(seconds=settings.DASHBOARD_SUMMARY_MAX_AGE_SECONDS):
+                return self._build_summary(
+                    snapshot.month_cost,
+                    snapshot.prev_month_cost,
+                    snapshot.resource_count,
+                    snapshot.classification_summary,
+                    snapshot.pending_decisions,
+                    snapshot.potential_savings,
+                    snapshot.active_providers,
+                    last_refreshed_at=refreshed_at,
+                )
+        
         start_date = end_date - timedelta(days=30)
         prev_start = start_date - timedelta(days=30)
         
-        # Current month cost
-        current_cost = await self._get_total_cost(user_id, start_date, end_date)
-        prev_cost = await self._get_total_cost(user_id, prev_start, start_date)
-        
-        cost_change_pct = 0
-        if prev_cost > 0:
-            cost_change_pct = float((current_cost - prev_cost) / prev_cost * 100)
-        
-        # Resource counts
-        resource_count = await self._get_resource_count(user_id)
-        
-        # Classification summary
-        classification = await self._get_classification_summary(user_id)
-        
-        # Pending decisions
-        pending = await self._get_pending_decisions(user_id)
-        
-        # Potential savings
-        savings = await self._get_potential_savings(user_id)
-        
-        # Active providers
-        providers = await self._get_active_providers(user_id)
+        # The widgets are independent, so fetch them concurrently
+        (
+            current_cost,
+            prev_cost,
+            resource_count,
+            classification,
+            pending,
+            savings,
+            providers,
+        ) = await asyncio.gather(
+            self._get_total_cost(user_id, start_date, end_date),
+            self._get_total_cost(user_id, prev_start, start_date),
+            self._get_resource_count(user_id),
+            self._get_classification_summary(user_id),
+            self._get_pending_decisions(user_id),
+            self._get_potential_savings(user_id),
+            self._get_active_providers(user_id),
+        )
         
-        return DashboardSummaryResponse(
-            total_monthly_cost=current_cost,
-            cost_change_pct=cost_change_pct,
-            total_resources=resource_count,
-            classification_summary=classification,
-            pending_decisions=pending,
-            potential_savings=savings,
-            active_providers=providers,
+        return self._build_summary(
+            current_cost,
+            prev_cost,
+            resource_count,
+            classification,
+            pending,
+            savings,
+            providers,
         )
     
     async def get_cost_chart(
         self,
         user_id: int,
         months: int = 6,
+        now: datetime | None = None,
     ) -> CostOverviewChart:
         """Get cost data formatted for charts."""
-        end_date = datetime.now(timezone.utc)
+        end_date = now or datetime.now(timezone.utc)
         start_date = end_date - timedelta(days=30 * months)
         
         # Get monthly aggregated costs
-        result = await self.db.execute(
+        result = await self._execute(
             select(
                 func.date_format(CostRecord.period_start, '%Y-%m').label('month'),
                 CostRecord.provider,
@@ -94,129 +172,168 @@ class DashboardService:
         )
         
         rows = result.all()
+        if not rows:
+            return CostOverviewChart(labels=[], datasets=[])
         
-        # Organize by month
-        months_data: dict[str, dict[str, Decimal]] = {}
-        providers_set: set[str] = set()
-        
-        for row in rows:
-            month = row.month
-            provider = row.provider
-            total = row.total
-            
-            if month not in months_data:
-                months_data[month] = {}
-            months_data[month][provider] = total
-            providers_set.add(provider)
+        # Pivot to a month x provider grid; months without spend become 0
+        df = pd.DataFrame(
+            [(row.month, row.provider, float(row.total or 0)) for row in rows],
+            columns=['month', 'provider', 'total'],
+        )
+        pivot = (
+            df.pivot_table(index='month', columns='provider', values='total', aggfunc='sum')
+            .fillna(0.0)
+            .sort_index()
+            .sort_index(axis=1)
+        )
         
         # Build chart data
-        labels = sorted(months_data.keys())
-        datasets = []
+        labels = pivot.index.tolist()
         colors = ['#3B82F6', '#10B981', '#F59E0B', '#EF4444', '#8B5CF6']
-        
-        for idx, provider in enumerate(sorted(providers_set)):
-            data = [float(months_data.get(m, {}).get(provider, 0)) for m in labels]
-            datasets.append({
+        datasets = [
+            {
                 'label': provider.upper(),
-                'data': data,
+                'data': pivot[provider].tolist(),
                 'backgroundColor': colors[idx % len(colors)],
                 'borderColor': colors[idx % len(colors)],
-            })
+            }
+            for idx, provider in enumerate(pivot.columns)
+        ]
         
         return CostOverviewChart(labels=labels, datasets=datasets)
     
     async def get_resource_breakdown(self, user_id: int) -> ResourceBreakdownChart:
         """Get resource breakdown for visualization."""
-        from app.modules.metadata.models import MetadataRecord
+        # Collapse to one row per resource first so the outer counts are plain
+        # COUNT(*) rather than COUNT(DISTINCT resource_id)
+        by_provider_resource = (
+            select(
+                CostRecord.provider,
+                CostRecord.resource_id,
+                func.sum(CostRecord.cost_amount).label('cost_sum'),
+            )
+            .where(CostRecord.user_id == user_id)
+            .group_by(CostRecord.provider, CostRecord.resource_id)
+            .subquery()
+        )
+        by_region_resource = (
+            select(
+                CostRecord.region,
+                CostRecord.resource_id,
+                func.sum(CostRecord.cost_amount).label('cost_sum'),
+            )
+            .where(CostRecord.user_id == user_id)
+            .group_by(CostRecord.region, CostRecord.resource_id)
+            .subquery()
+        )
         
-        # By type
-        type_result = await self.db.execute(
+        # One round-trip: each branch tags its rows with the dimension it belongs to
+        breakdown = union_all(
+            # By type
             select(
-                MetadataRecord.entity_type,
-                func.count(MetadataRecord.id).label('count')
+                literal('type').label('dim'),
+                MetadataRecord.entity_type.label('key'),
+                func.count(MetadataRecord.id).label('count'),
+                literal(None, Numeric(15, 6)).label('cost'),
             )
             .where(MetadataRecord.user_id == user_id)
-            .group_by(MetadataRecord.entity_type)
+            .group_by(MetadataRecord.entity_type),
+            # By provider with cost
+            select(
+                literal('provider').label('dim'),
+                by_provider_resource.c.provider.label('key'),
+                func.count().label('count'),
+                func.sum(by_provider_resource.c.cost_sum).label('cost'),
+            )
+            .group_by(by_provider_resource.c.provider),
+            # By region with cost
+            select(
+                literal('region').label('dim'),
+                by_region_resource.c.region.label('key'),
+                func.count().label('count'),
+                func.sum(by_region_resource.c.cost_sum).label('cost'),
+            )
+            .group_by(by_region_resource.c.region),
         )
-        by_type_rows = type_result.all()
+        result = await self._execute(breakdown)
+        
+        rows_by_dim: dict[str, list] = {'type': [], 'provider': [], 'region': []}
+        for row in result:
+            rows_by_dim[row.dim].append(row)
+        
+        by_type_rows = rows_by_dim['type']
         total = sum(r.count for r in by_type_rows) or 1
         
         by_type = [
-            {'type': r.entity_type, 'count': r.count, 'percentage': round(r.count / total * 100, 1)}
+            {'type': r.key, 'count': r.count, 'percentage': round(r.count / total * 100, 1)}
             for r in by_type_rows
         ]
         
-        # By provider with cost
-        provider_result = await self.db.execute(
-            select(
-                CostRecord.provider,
-                func.count(func.distinct(CostRecord.resource_id)).label('count'),
-                func.sum(CostRecord.cost_amount).label('cost')
-            )
-            .where(CostRecord.user_id == user_id)
-            .group_by(CostRecord.provider)
-        )
         by_provider = [
             {
-                'provider': r.provider,
+                'provider': r.key,
                 'count': r.count,
                 'cost': float(r.cost) if r.cost else 0,
             }
-            for r in provider_result.all()
+            for r in rows_by_dim['provider']
         ]
         
-        # By region with cost
-        region_result = await self.db.execute(
-            select(
-                CostRecord.region,
-                func.count(func.distinct(CostRecord.resource_id)).label('count'),
-                func.sum(CostRecord.cost_amount).label('cost')
-            )
-            .where(CostRecord.user_id == user_id)
-            .group_by(CostRecord.region)
-        )
         by_region = [
             {
-                'region': r.region or 'unknown',
+                'region': r.key or 'unknown',
                 'count': r.count,
                 'cost': float(r.cost) if r.cost else 0,
             }
-            for r in region_result.all()
+            for r in rows_by_dim['region']
         ]
         
         return ResourceBreakdownChart(by_type=by_type, by_provider=by_provider, by_region=by_region)
     
+    @dashboard_cached()
     async def get_top_resources(
         self,
         user_id: int,
         limit: int = 10,
+        now: datetime | None = None,
     ) -> list[TopResourcesTable]:
         """Get top resources by cost."""
-        # Current month
-        end_date = datetime.now(timezone.utc)
+        # Current month and the month before it, summed in one scan
+        end_date = now or datetime.now(timezone.utc)
         start_date = end_date - timedelta(days=30)
+        prev_start = start_date - timedelta(days=30)
+        
+        current_cost = func.sum(case((CostRecord.period_start >= start_date, CostRecord.cost_amount)))
+        prev_cost = func.sum(case((CostRecord.period_start < start_date, CostRecord.cost_amount)))
         
-        result = await self.db.execute(
+        result = await self._execute(
             select(
                 CostRecord.resource_id,
                 CostRecord.service_type,
                 CostRecord.provider,
-                func.sum(CostRecord.cost_amount).label('cost')
+                current_cost.label('cost'),
+                prev_cost.label('prev_cost'),
             )
             .where(
                 CostRecord.user_id == user_id,
-                CostRecord.period_start >= start_date,
+                CostRecord.period_start >= prev_start,
             )
             .group_by(CostRecord.resource_id, CostRecord.service_type, CostRecord.provider)
-            .order_by(func.sum(CostRecord.cost_amount).desc())
+            .having(current_cost != None)
+            .order_by(current_cost.desc())
             .limit(limit)
         )
         
         resources = []
-        for row in result.all():
-            # Simple trend calculation (compare to previous month)
+        for row in result:
+            # Compare to previous month
             trend = 'stable'
             trend_pct = 0.0
+            if row.prev_cost:
+                trend_pct = float((row.cost - row.prev_cost) / row.prev_cost * 100)
+                if trend_pct > TREND_THRESHOLD_PCT:
+                    trend = 'up'
+                elif trend_pct < -TREND_THRESHOLD_PCT:
+                    trend = 'down'
             
             resources.append(TopResourcesTable(
                 resource_id=row.resource_id,
@@ -229,99 +346,129 @@ class DashboardService:
         
         return resources
     
+    @dashboard_cached()
     async def get_recommendations_widget(self, user_id: int) -> RecommendationsWidget:
         """Get recommendations summary for dashboard widget."""
-        # Pending decisions by priority (based on potential savings)
-        result = await self.db.execute(
-            select(Decision)
-            .where(
-                Decision.user_id == user_id,
-                Decision.approved_at == None,
-                Decision.dismissed_at == None,
-            )
-            .order_by(Decision.estimated_savings_monthly.desc())
+        pending = (
+            Decision.user_id == user_id,
+            Decision.approved_at == None,
+            Decision.dismissed_at == None,
+        )
+        savings = Decision.estimated_savings_monthly
+        
+        # Bucket pending decisions by priority (based on potential savings) in SQL
+        buckets = {
+            'high': savings > 100,
+            'medium': (savings > 20) & (savings <= 100),
+            'low': (savings != 0) & (savings <= 20),
+        }
+        
+        # Widget values are display floats. MySQL can't CAST to FLOAT, so the
+        # sums are only typed as Float: the driver's Decimal is converted to
+        # float as each row is read, and never summed in Python
+        def float_sum(condition):
+            return type_coerce(func.coalesce(func.sum(case((condition, savings))), 0), Float)
+        
+        totals_result, top_result = await asyncio.gather(
+            self._execute(
+                select(
+                    func.count().label('total_count'),
+                    func.count(case((buckets['high'], 1))).label('high_count'),
+                    float_sum(buckets['high']).label('high_savings'),
+                    func.count(case((buckets['medium'], 1))).label('medium_count'),
+                    float_sum(buckets['medium']).label('medium_savings'),
+                    func.count(case((buckets['low'], 1))).label('low_count'),
+                    float_sum(buckets['low']).label('low_savings'),
+                )
+                .where(*pending)
+            ),
+            # Top actions
+            self._execute(
+                select(
+                    Decision.action_type,
+                    Decision.context,
+                    type_coerce(func.coalesce(savings, 0), Float).label('savings'),
+                )
+                .where(*pending)
+                .order_by(savings.desc())
+                .limit(5)
+            ),
         )
         
-        decisions = result.scalars().all()
-        
-        # Categorize by priority
-        high_priority = [d for d in decisions if d.estimated_savings_monthly and d.estimated_savings_monthly > 100]
-        medium_priority = [d for d in decisions if d.estimated_savings_monthly and 20 < d.estimated_savings_monthly <= 100]
-        low_priority = [d for d in decisions if d.estimated_savings_monthly and d.estimated_savings_monthly <= 20]
-        
-        total_savings = sum(d.estimated_savings_monthly or 0 for d in decisions)
-        
+        totals = totals_result.one()
         by_priority = [
-            {'priority': 'high', 'count': len(high_priority), 'potential_savings': float(sum(d.estimated_savings_monthly or 0 for d in high_priority))},
-            {'priority': 'medium', 'count': len(medium_priority), 'potential_savings': float(sum(d.estimated_savings_monthly or 0 for d in medium_priority))},
-            {'priority': 'low', 'count': len(low_priority), 'potential_savings': float(sum(d.estimated_savings_monthly or 0 for d in low_priority))},
+            {
+                'priority': priority,
+                'count': getattr(totals, f'{priority}_count') or 0,
+                'potential_savings': getattr(totals, f'{priority}_savings'),
+            }
+            for priority in buckets
         ]
         
-        # Top actions
         top_actions = [
             {
-                'action': d.action_type,
-                'resource_id': d.context.get('resource_id', 'unknown') if d.context else 'unknown',
-                'savings': float(d.estimated_savings_monthly) if d.estimated_savings_monthly else 0,
+                'action': row.action_type,
+                'resource_id': row.context.get('resource_id', 'unknown') if row.context else 'unknown',
+                'savings': row.savings,
             }
-            for d in decisions[:5]
+            for row in top_result
         ]
         
         return RecommendationsWidget(
-            total_recommendations=len(decisions),
+            total_recommendations=totals.total_count,
             by_priority=by_priority,
             top_actions=top_actions,
         )
     
-    async def get_ingestion_status(self, user_id: int) -> IngestionStatusWidget:
+    @dashboard_cached()
+    async def get_ingestion_status(
+        self,
+        user_id: int,
+        now: datetime | None = None,
+    ) -> IngestionStatusWidget:
         """Get recent ingestion job status."""
-        # Recent jobs
-        result = await self.db.execute(
-            select(IngestionJob)
-            .where(IngestionJob.user_id == user_id)
-            .order_by(IngestionJob.created_at.desc())
-            .limit(5)
+        today_start = (now or datetime.now(timezone.utc)).replace(hour=0, minute=0, second=0, microsecond=0)
+        week_start = today_start - timedelta(days=today_start.weekday())
+        
+        result, counts_result = await asyncio.gather(
+            # Recent jobs; the record count is extracted from the metadata JSON
+            # in-query so the full blob never leaves the database
+            self._execute(
+                select(
+                    IngestionJob.id,
+                    IngestionJob.status,
+                    IngestionJob.file_name,
+                    IngestionJob.job_metadata['records_extracted'].as_integer().label('records_processed'),
+                )
+                .where(IngestionJob.user_id == user_id)
+                .order_by(IngestionJob.created_at.desc())
+                .limit(5)
+            ),
+            # Jobs today, jobs this week and total records in a single pass
+            self._execute(
+                select(
+                    func.count(case((IngestionJob.created_at >= today_start, 1))).label('jobs_today'),
+                    func.count(case((IngestionJob.created_at >= week_start, 1))).label('jobs_week'),
+                    func.sum(IngestionJob.file_size).label('total_records'),
+                )
+                .where(IngestionJob.user_id == user_id)
+            ),
         )
         
-        recent = result.scalars().all()
         recent_jobs = [
             {
                 'id': j.id,
                 'status': j.status,
                 'file_name': j.file_name,
-                'records_processed': j.job_metadata.get('records_extracted', 0) if j.job_metadata else 0,
+                'records_processed': j.records_processed or 0,
             }
-            for j in recent
+            for j in result
         ]
         
-        # Jobs today
-        today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
-        jobs_today_result = await self.db.execute(
-            select(func.count(IngestionJob.id))
-            .where(
-                IngestionJob.user_id == user_id,
-                IngestionJob.created_at >= today_start,
-            )
-        )
-        jobs_today = jobs_today_result.scalar() or 0
-        
-        # Jobs this week
-        week_start = today_start - timedelta(days=today_start.weekday())
-        jobs_week_result = await self.db.execute(
-            select(func.count(IngestionJob.id))
-            .where(
-                IngestionJob.user_id == user_id,
-                IngestionJob.created_at >= week_start,
-            )
-        )
-        jobs_week = jobs_week_result.scalar() or 0
-        
-        # Total records
-        total_records_result = await self.db.execute(
-            select(func.sum(IngestionJob.file_size))
-            .where(IngestionJob.user_id == user_id)
-        )
-        total_records = total_records_result.scalar() or 0
+        counts = counts_result.one()
+        jobs_today = counts.jobs_today or 0
+        jobs_week = counts.jobs_week or 0
+        total_records = counts.total_records or 0
         
         return IngestionStatusWidget(
             recent_jobs=recent_jobs,
@@ -330,26 +477,59 @@ class DashboardService:
             total_records=int(total_records),
         )
     
-    async def get_alerts(self, user_id: int) -> DashboardAlertsResponse:
+    @dashboard_cached()
+    async def get_alerts(
+        self,
+        user_id: int,
+        now: datetime | None = None,
+    ) -> DashboardAlertsResponse:
         """Get active alerts for the dashboard."""
         alerts: list[AlertItem] = []
         
         # Check for high cost anomalies
-        end_date = datetime.now(timezone.utc)
+        end_date = now or datetime.now(timezone.utc)
         start_date = end_date - timedelta(days=7)
         
-        high_cost_result = await self.db.execute(
-            select(CostRecord)
+        # MAX() is an index-only aggregate over ix_cost_user_period_cost, so the
+        # highest-cost record is found without a top-N sort
+        max_cost = (
+            select(func.max(CostRecord.cost_amount))
             .where(
                 CostRecord.user_id == user_id,
                 CostRecord.period_start >= start_date,
                 CostRecord.cost_amount > 1000,
             )
-            .order_by(CostRecord.cost_amount.desc())
-            .limit(1)
+            .scalar_subquery()
+        )
+        
+        high_cost_result, failed_result = await asyncio.gather(
+            self._execute(
+                select(
+                    CostRecord.id,
+                    CostRecord.resource_id,
+                    CostRecord.cost_amount,
+                    CostRecord.created_at,
+                )
+                .where(
+                    CostRecord.user_id == user_id,
+                    CostRecord.period_start >= start_date,
+                    CostRecord.cost_amount == max_cost,
+                )
+                .limit(1)
+            ),
+            # Check for failed ingestion jobs
+            self._execute(
+                select(IngestionJob.id, IngestionJob.file_name, IngestionJob.created_at)
+                .where(
+                    IngestionJob.user_id == user_id,
+                    IngestionJob.status == 'failed',
+                )
+                .order_by(IngestionJob.created_at.desc())
+                .limit(1)
+            ),
         )
         
-        high_cost = high_cost_result.scalar_one_or_none()
+        high_cost = high_cost_result.one_or_none()
         if high_cost:
             alerts.append(AlertItem(
                 severity='warning',
@@ -359,18 +539,7 @@ class DashboardService:
                 detected_at=high_cost.created_at,
             ))
         
-        # Check for failed ingestion jobs
-        failed_result = await self.db.execute(
-            select(IngestionJob)
-            .where(
-                IngestionJob.user_id == user_id,
-                IngestionJob.status == 'failed',
-            )
-            .order_by(IngestionJob.created_at.desc())
-            .limit(1)
-        )
-        
-        failed = failed_result.scalar_one_or_none()
+        failed = failed_result.one_or_none()
         if failed:
             alerts.append(AlertItem(
                 severity='info',
@@ -392,6 +561,49 @@ class DashboardService:
     
     # === Helper methods ===
     
+    async def _execute(self, statement: Executable, params: dict | None = None) -> Result:
+        """
+        Run a read-only statement on its own short-lived session.
+        
+        AsyncSession is not safe for concurrent use, so each query gets a
+        separate session; the semaphore bounds how many connections a single
+        dashboard request can hold at once.
+        """
+        async with self._query_slots, self.session_factory() as session:
+            return await session.execute(statement, params)
+    
+    async def _get_summary_snapshot(self, user_id: int) -> DashboardSummary | None:
+        """Get the pre-aggregated summary written by the refresh task."""
+        result = await self._execute(_STMT_SUMMARY_SNAPSHOT, {'user_id': user_id})
+        return result.scalar_one_or_none()
+    
+    def _build_summary(
+        self,
+        current_cost: Decimal,
+        prev_cost: Decimal,
+        resource_count: int,
+        classification: dict[str, int],
+        pending: int,
+        savings: Decimal,
+        providers: list[str],
+        last_refreshed_at: datetime | None = None,
+    ) -> DashboardSummaryResponse:
+        """Assemble the summary response from its widget figures."""
+        cost_change_pct = 0
+        if prev_cost > 0:
+            cost_change_pct = float((current_cost - prev_cost) / prev_cost * 100)
+        
+        return DashboardSummaryResponse(
+            total_monthly_cost=current_cost,
+            cost_change_pct=cost_change_pct,
+            total_resources=resource_count,
+            classification_summary=classification,
+            pending_decisions=pending,
+            potential_savings=savings,
+            active_providers=providers,
+            last_refreshed_at=last_refreshed_at,
+        )
+    
     async def _get_total_cost(
         self,
         user_id: int,
@@ -399,66 +611,33 @@ class DashboardService:
         end: datetime,
     ) -> Decimal:
         """Get total cost for a period."""
-        result = await self.db.execute(
-            select(func.sum(CostRecord.cost_amount))
-            .where(
-                CostRecord.user_id == user_id,
-                CostRecord.period_start >= start,
-                CostRecord.period_end <= end,
-            )
+        result = await self._execute(
+            _STMT_TOTAL_COST,
+            {'user_id': user_id, 'start': start, 'end': end},
         )
         return result.scalar() or Decimal('0')
     
     async def _get_resource_count(self, user_id: int) -> int:
         """Get total resource count."""
-        from app.modules.metadata.models import MetadataRecord
-        
-        result = await self.db.execute(
-            select(func.count(MetadataRecord.id))
-            .where(MetadataRecord.user_id == user_id)
-        )
+        result = await self._execute(_STMT_RESOURCE_COUNT, {'user_id': user_id})
         return result.scalar() or 0
     
     async def _get_classification_summary(self, user_id: int) -> dict[str, int]:
         """Get classification summary."""
-        result = await self.db.execute(
-            select(
-                ClassificationResult.category,
-                func.count(ClassificationResult.id).label('count')
-            )
-            .where(ClassificationResult.user_id == user_id)
-            .group_by(ClassificationResult.category)
-        )
-        return {row.category: row.count for row in result.all()}
+        result = await self._execute(_STMT_CLASSIFICATION_SUMMARY, {'user_id': user_id})
+        return {row.category: row.count for row in result}
     
     async def _get_pending_decisions(self, user_id: int) -> int:
         """Get count of pending decisions."""
-        result = await self.db.execute(
-            select(func.count(Decision.id))
-            .where(
-                Decision.user_id == user_id,
-                Decision.approved_at == None,
-                Decision.dismissed_at == None,
-            )
-        )
+        result = await self._execute(_STMT_PENDING_DECISIONS, {'user_id': user_id})
         return result.scalar() or 0
     
     async def _get_potential_savings(self, user_id: int) -> Decimal:
         """Get total potential savings."""
-        result = await self.db.execute(
-            select(func.sum(Decision.estimated_savings_monthly))
-            .where(
-                Decision.user_id == user_id,
-                Decision.dismissed_at == None,
-            )
-        )
+        result = await self._execute(_STMT_POTENTIAL_SAVINGS, {'user_id': user_id})
         return result.scalar() or Decimal('0')
     
     async def _get_active_providers(self, user_id: int) -> list[str]:
         """Get list of active providers."""
-        result = await self.db.execute(
-            select(CostRecord.provider)
-            .where(CostRecord.user_id == user_id)
-            .distinct()
-        )
-        return [row.provider for row in result.all()]
+        result = await self._execute(_STMT_ACTIVE_PROVIDERS, {'user_id': user_id})
+        return [row.provider for row in result]
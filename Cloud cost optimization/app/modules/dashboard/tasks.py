@@ -0,0 +1,28 @@
+"""Celery tasks for dashboard summary maintenance."""
+
+from celery import shared_task
+
+from app.core.database import AsyncSessionLocal
+from app.core.event_loop import run_async
+from app.modules.dashboard.repository import DashboardSummaryRepository
+
+
+@shared_task
+def refresh_dashboard_summaries() -> dict:
+    """
+    Recompute the pre-aggregated dashboard summary for every user.
+    
+    Returns:
+        Dict with the number of summaries refreshed
+    """
+    async def _refresh():
+        async with AsyncSessionLocal() as db:
+            repo = DashboardSummaryRepository(db)
+            refreshed = await repo.refresh_all()
+            await db.commit()
+            
+            return {
+                'summaries_refreshed': refreshed,
+            }
+    
+    return run_async(_refresh())
@@ -1,6 +1,7 @@
 """Rule engine for generating cost optimization recommendations."""
 
-from dataclasses import dataclass
+from collections import namedtuple
+from dataclasses import dataclass, field
 from decimal import Decimal
 from typing import Any, Callable
 
@@ -9,6 +10,46 @@ from app.modules.classification.models import ClassificationResult
 from app.modules.cost.models import CostRecord
 
 
+# Metadata attributes read into the evaluation context, with their defaults
+ATTRIBUTE_DEFAULTS: dict[str, Any] = {
+    'size_gb': 0,
+    'object_count': 0,
+    'storage_class': 'STANDARD',
+    'avg_cpu_utilization': 0,
+    'running_hours': 0,
+    'state': 'unknown',
+    'days_stopped': 0,
+    'max_connections': 0,
+    'avg_connections': 0,
+    'is_read_replica': False,
+    'read_iops': 0,
+    'days_since_update': 0,
+    'days_since_access': 0,
+}
+
+RuleContext = namedtuple(
+    'RuleContext',
+    [
+        # Resource identification
+        'resource_id',
+        'entity_type',
+        'service_type',
+        'provider',
+        'region',
+        # Cost metrics
+        'monthly_cost',
+        'usage_quantity',
+        'usage_unit',
+        # Classification
+        'classification_category',
+        'classification_confidence',
+        # Attributes from metadata
+        *ATTRIBUTE_DEFAULTS,
+        'environment',
+    ],
+)
+
+
 @dataclass
 class RuleCondition:
     """Condition for evaluating a rule."""
@@ -29,6 +70,80 @@ class DecisionRule:
     recommendation_template: str
     confidence: float
     auto_execute: bool  # Whether this rule can auto-execute
+    # Compiled from `conditions` by RuleEngine; takes an evaluation context
+    predicate: Callable[[RuleContext], bool] | None = field(default=None, repr=False, compare=False)
+
+
+def _gt(actual: Any, expected: float) -> bool:
+    """Numeric greater-than; missing or non-numeric values never match."""
+    if actual is None:
+        return False
+    try:
+        return float(actual) > expected
+    except (ValueError, TypeError):
+        return False
+
+
+def _lt(actual: Any, expected: float) -> bool:
+    """Numeric less-than; missing or non-numeric values never match."""
+    if actual is None:
+        return False
+    try:
+        return float(actual) < expected
+    except (ValueError, TypeError):
+        return False
+
+
+def _contains(actual: Any, expected: str) -> bool:
+    """Case-insensitive substring match; `expected` is already lowercased."""
+    return actual is not None and expected in str(actual).lower()
+
+
+def _in(actual: Any, expected: Any) -> bool:
+    """Membership test; missing values never match."""
+    return actual is not None and actual in expected
+
+
+def compile_conditions(conditions: list[RuleCondition]) -> Callable[[RuleContext], bool]:
+    """
+    Compile a rule's conditions into a single predicate over a RuleContext.
+    
+    Rules are static, so the operator dispatch is resolved once here and the
+    conditions are unrolled into one short-circuiting expression. Expected
+    values are bound by name, never interpolated into the source.
+    """
+    namespace: dict[str, Any] = {'_gt': _gt, '_lt': _lt, '_contains': _contains, '_in': _in}
+    clauses = []
+    
+    for idx, condition in enumerate(conditions):
+        name = f'_v{idx}'
+        actual = f'c.{condition.field}'
+        expected = condition.value
+        
+        if condition.field not in RuleContext._fields:
+            # Fields the context never carries can't match
+            clause = 'False'
+        elif condition.operator == 'eq':
+            clause = f'{actual} == {name}' if expected is not None else 'False'
+        elif condition.operator in ('gt', 'lt'):
+            try:
+                expected = float(expected)
+                clause = f'_{condition.operator}({actual}, {name})'
+            except (ValueError, TypeError):
+                clause = 'False'
+        elif condition.operator == 'contains':
+            expected = str(expected).lower()
+            clause = f'_contains({actual}, {name})'
+        elif condition.operator == 'in':
+            clause = f'_in({actual}, {name})'
+        else:
+            clause = 'False'
+        
+        namespace[name] = expected
+        clauses.append(f'({clause})')
+    
+    source = f"lambda c: {' and '.join(clauses) or 'True'}"
+    return eval(compile(source, '<rule>', 'eval'), namespace)
 
 
 class RuleEngine:
@@ -40,6 +155,22 @@ class RuleEngine:
     
     def __init__(self):
         self.rules: list[DecisionRule] = self._load_rules()
+        for rule in self.rules:
+            rule.predicate = compile_conditions(rule.conditions)
+        
+        # Rules pinned to an entity type only apply to that type; the rest apply
+        # to everything. Each list keeps the original rule order.
+        required_types = {rule.id: self._required_entity_type(rule) for rule in self.rules}
+        self._untyped_rules: list[DecisionRule] = [
+            rule for rule in self.rules if required_types[rule.id] is None
+        ]
+        self._rules_by_type: dict[str, list[DecisionRule]] = {
+            entity_type: [
+                rule for rule in self.rules
+                if required_types[rule.id] in (entity_type, None)
+            ]
+            for entity_type in set(required_types.values()) - {None}
+        }
     
     def _load_rules(self) -> list[DecisionRule]:
         """Load default decision rules."""
@@ -201,8 +332,9 @@ class RuleEngine:
         decisions = []
         context = self._build_context(cost_record, classification)
         
-        for rule in self.rules:
-            if self._evaluate_conditions(rule.conditions, context):
+        rules = self._rules_by_type.get(context.entity_type, self._untyped_rules)
+        for rule in rules:
+            if rule.predicate(context):
                 decision = self._generate_decision(rule, context, cost_record)
                 decisions.append(decision)
         
@@ -211,102 +343,51 @@ class RuleEngine:
         
         return decisions
     
+    @staticmethod
+    def _required_entity_type(rule: DecisionRule) -> str | None:
+        """Return the entity type a rule is restricted to, if any."""
+        for condition in rule.conditions:
+            if condition.field == 'entity_type' and condition.operator == 'eq':
+                return condition.value
+        return None
+    
     def _build_context(
         self,
         cost_record: CostRecord,
         classification: ClassificationResult | None,
-    ) -> dict:
+    ) -> RuleContext:
         """Build evaluation context from cost record and classification."""
         attrs = cost_record.attributes or {}
         tags = cost_record.tags or {} if hasattr(cost_record, 'tags') else {}
         
-        context = {
-            # Resource identification
-            'resource_id': cost_record.resource_id,
-            'entity_type': attrs.get('entity_type', 'unknown'),
-            'service_type': cost_record.service_type,
-            'provider': cost_record.provider,
-            'region': cost_record.region,
-            
-            # Cost metrics
-            'monthly_cost': float(cost_record.cost_amount),
-            'usage_quantity': float(cost_record.usage_quantity),
-            'usage_unit': cost_record.usage_unit,
-            
-            # Classification
-            'classification_category': classification.category if classification else 'unknown',
-            'classification_confidence': classification.confidence if classification else 0,
-            
-            # Attributes from metadata
-            'size_gb': float(attrs.get('size_gb', 0)),
-            'object_count': attrs.get('object_count', 0),
-            'storage_class': attrs.get('storage_class', 'STANDARD'),
-            'avg_cpu_utilization': float(attrs.get('avg_cpu_utilization', 0)),
-            'running_hours': attrs.get('running_hours', 0),
-            'state': attrs.get('state', 'unknown'),
-            'days_stopped': attrs.get('days_stopped', 0),
-            'max_connections': attrs.get('max_connections', 0),
-            'avg_connections': attrs.get('avg_connections', 0),
-            'is_read_replica': attrs.get('is_read_replica', False),
-            'read_iops': attrs.get('read_iops', 0),
-            'days_since_update': attrs.get('days_since_update', 0),
-            'days_since_access': attrs.get('days_since_access', 0),
-            'environment': self._get_tag_value(tags, 'environment', ''),
-        }
-        
-        return context
-    
-    def _evaluate_conditions(
-        self,
-        conditions: list[RuleCondition],
-        context: dict,
-    ) -> bool:
-        """Evaluate all conditions against the context."""
-        for condition in conditions:
-            if not self._evaluate_condition(condition, context):
-                return False
-        return True
-    
-    def _evaluate_condition(
-        self,
-        condition: RuleCondition,
-        context: dict,
-    ) -> bool:
-        """Evaluate a single condition."""
-        actual_value = context.get(condition.field)
-        expected_value = condition.value
-        
-        if actual_value is None:
-            return False
-        
-        if condition.operator == 'eq':
-            return actual_value == expected_value
-        elif condition.operator == 'gt':
-            try:
-                return float(actual_value) > float(expected_value)
-            except (ValueError, TypeError):
-                return False
-        elif condition.operator == 'lt':
-            try:
-                return float(actual_value) < float(expected_value)
-            except (ValueError, TypeError):
-                return False
-        elif condition.operator == 'contains':
-            return str(expected_value).lower() in str(actual_value).lower()
-        elif condition.operator == 'in':
-            return actual_value in expected_value
+        attributes = {key: attrs.get(key, default) for key, default in ATTRIBUTE_DEFAULTS.items()}
+        attributes['size_gb'] = float(attributes['size_gb'])
+        attributes['avg_cpu_utilization'] = float(attributes['avg_cpu_utilization'])
         
-        return False
+        return RuleContext(
+            resource_id=cost_record.resource_id,
+            entity_type=attrs.get('entity_type', 'unknown'),
+            service_type=cost_record.service_type,
+            provider=cost_record.provider,
+            region=cost_record.region,
+            monthly_cost=float(cost_record.cost_amount),
+            usage_quantity=float(cost_record.usage_quantity),
+            usage_unit=cost_record.usage_unit,
+            classification_category=classification.category if classification else 'unknown',
+            classification_confidence=classification.confidence if classification else 0,
+            environment=self._get_tag_value(tags, 'environment', ''),
+            **attributes,
+        )
     
     def _generate_decision(
         self,
         rule: DecisionRule,
-        context: dict,
+        context: RuleContext,
         cost_record: CostRecord,
     ) -> dict:
         """Generate a decision based on a matched rule."""
         # Calculate potential savings (simple estimation)
-        monthly_cost = float(context.get('monthly_cost', 0))
+        monthly_cost = context.monthly_cost
         
         # Estimate savings based on action type
         if rule.action in [DecisionAction.DELETE, DecisionAction.ARCHIVE]:
@@ -317,15 +398,14 @@ class RuleEngine:
             estimated_savings = monthly_cost * 0.2  # Conservative 20%
         
         # Build recommendation message
+        context_data = context._asdict()
         recommendation = rule.recommendation_template.format(
-            resource_id=context['resource_id'],
-            days=context.get('days_since_update', context.get('days_stopped', 0)),
-            size_gb=context.get('size_gb', 0),
-            cpu=context.get('avg_cpu_utilization', 0),
-            variance=context.get('cost_variance_pct', 0),
+            **context_data,
+            days=context.days_since_update,
+            cpu=context.avg_cpu_utilization,
+            variance=0,
             savings=f"{estimated_savings:.2f}",
             cost=f"{monthly_cost:.2f}",
-            **context
         )
         
         return {
@@ -336,9 +416,10 @@ class RuleEngine:
             'recommendation': recommendation,
             'confidence': rule.confidence,
             'auto_execute': rule.auto_execute,
-            'estimated_savings_monthly': Decimal(str(estimated_savings)),
+            # Whole cents, without a float -> str -> Decimal round-trip
+            'estimated_savings_monthly': Decimal(round(estimated_savings * 100)).scaleb(-2),
             'estimated_cost_to_implement': Decimal('0'),  # Most are config changes
-            'context': context,
+            'context': context_data,
         }
     
     @staticmethod
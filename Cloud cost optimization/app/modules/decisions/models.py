@@ -3,7 +3,7 @@
 from datetime import datetime, timezone
 from decimal import Decimal
 
-from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Integer, JSON, Numeric, String, Text
+from sqlalchemy import Boolean, CheckConstraint, DateTime, Float, ForeignKey, Index, Integer, JSON, LargeBinary, Numeric, String, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.constants import DecisionAction, WebhookStatus
@@ -14,6 +14,25 @@ class Decision(Base):
     """Automated or manual decisions/recommendations."""
     
     __tablename__ = "decisions"
+    __table_args__ = (
+        # Newest-first listings, optionally filtered by status or action
+        Index("ix_decisions_user_created", "user_id", "created_at"),
+        Index("ix_decisions_user_status", "user_id", "webhook_status", "created_at"),
+        Index("ix_decisions_user_action", "user_id", "action_type", "created_at"),
+        # Pending-decision scans ordered by savings (MySQL has no partial indexes)
+        Index(
+            "ix_decisions_user_pending",
+            "user_id",
+            "dismissed_at",
+            "approved_at",
+            "estimated_savings_monthly",
+        ),
+        Index("ix_decisions_user_automated", "user_id", "is_automated", "executed_at"),
+        # A rule produces at most one decision per cost record
+        UniqueConstraint("cost_record_id", "rule_id", name="uq_decisions_cost_rule"),
+        CheckConstraint("confidence >= 0 AND confidence <= 1", name="ck_decisions_confidence"),
+        CheckConstraint("webhook_attempts >= 0", name="ck_decisions_webhook_attempts"),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     # References
@@ -89,7 +108,9 @@ class Decision(Base):
         "WebhookLog",
         back_populates="decision",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        # Logs are opt-in via selectinload; deletes rely on ON DELETE CASCADE
+        lazy="raise_on_sql",
+        passive_deletes=True,
     )
 
 
@@ -109,8 +130,8 @@ class WebhookLog(Base):
     status_code: Mapped[int | None] = mapped_column(Integer, nullable=True)
     response_body: Mapped[str | None] = mapped_column(Text, nullable=True)
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
-    request_payload: Mapped[str] = mapped_column(Text, nullable=False)
-    # JSON string of the payload sent
+    # UTF-8 JSON payload exactly as sent (and signed)
+    request_payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
     triggered_at: Mapped[datetime] = mapped_column(
         default=lambda: datetime.now(timezone.utc),
         nullable=False,
@@ -1,11 +1,117 @@
 """Database access layer for decision operations."""
 
-from sqlalchemy import func, select
+from datetime import datetime
+
+from sqlalchemy import Integer, Numeric, Row, bindparam, case, func, literal, select, union_all
+from sqlalchemy.dialects.mysql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.database import NAMED_LOCKS_KEY
 from app.modules.decisions.models import Decision, WebhookLog
 
 
+# Hot statements are built once; callers bind values at execution time
+_STMT_BY_ID = select(Decision).where(
+    Decision.id == bindparam('decision_id'),
+    Decision.user_id == bindparam('user_id')
+)
+_STMT_EXISTS = select(Decision.id).where(
+    Decision.id == bindparam('decision_id'),
+    Decision.user_id == bindparam('user_id')
+)
+_STMT_WEBHOOK_LOGS_FOR_USER = (
+    select(WebhookLog)
+    .join(Decision, WebhookLog.decision_id == Decision.id)
+    .where(
+        Decision.id == bindparam('decision_id'),
+        Decision.user_id == bindparam('user_id')
+    )
+    .order_by(WebhookLog.triggered_at.desc())
+    .limit(bindparam('limit'))
+)
+
+# MySQL named-lock prefix; a held lock means a delivery is in flight
+WEBHOOK_LOCK_PREFIX = "costintel:webhook:"
+
+# Columns written by WebhookLogRepository.create_many
+_WEBHOOK_LOG_COLUMNS = tuple(
+    column.key for column in WebhookLog.__table__.columns if not column.primary_key
+)
+
+# Columns returned by list_by_user, matching DecisionResponse
+_LIST_COLUMNS = (
+    Decision.id,
+    Decision.cost_record_id,
+    Decision.recommendation,
+    Decision.action_type,
+    Decision.confidence,
+    Decision.estimated_savings_monthly,
+    Decision.estimated_cost_to_implement,
+    Decision.currency,
+    Decision.is_automated,
+    Decision.approved_at,
+    Decision.executed_at,
+    Decision.webhook_status,
+    Decision.webhook_attempts,
+    Decision.created_at,
+)
+
+_NO_COUNT = literal(None, Integer)
+_NO_AMOUNT = literal(None, Numeric(15, 2))
+
+# One round-trip: each branch tags its rows with the statistic it carries
+_STMT_STATISTICS = union_all(
+    # Count by status
+    select(
+        literal('status').label('dim'),
+        Decision.webhook_status.label('key'),
+        func.count(Decision.id).label('count'),
+        _NO_COUNT.label('automated'),
+        _NO_AMOUNT.label('savings'),
+    )
+    .where(Decision.user_id == bindparam('user_id'))
+    .group_by(Decision.webhook_status),
+    # Count by action type
+    select(
+        literal('action').label('dim'),
+        Decision.action_type.label('key'),
+        func.count(Decision.id).label('count'),
+        _NO_COUNT.label('automated'),
+        _NO_AMOUNT.label('savings'),
+    )
+    .where(Decision.user_id == bindparam('user_id'))
+    .group_by(Decision.action_type),
+    # Pending approvals, automated executions and total estimated savings
+    select(
+        literal('totals').label('dim'),
+        literal(None).label('key'),
+        func.count(case((
+            (Decision.approved_at == None) & (Decision.dismissed_at == None),
+            1,
+        ))).label('count'),
+        func.count(case((
+            (Decision.is_automated == True) & (Decision.executed_at != None),
+            1,
+        ))).label('automated'),
+        func.sum(case((
+            Decision.dismissed_at == None,
+            Decision.estimated_savings_monthly,
+        ))).label('savings'),
+    )
+    .where(Decision.user_id == bindparam('user_id')),
+    # Webhook deliveries
+    select(
+        literal('webhooks').label('dim'),
+        literal(None).label('key'),
+        func.count(WebhookLog.id).label('count'),
+        _NO_COUNT.label('automated'),
+        _NO_AMOUNT.label('savings'),
+    )
+    .join(Decision)
+    .where(Decision.user_id == bindparam('user_id')),
+)
+
+
 class DecisionRepository:
     """Repository for decision operations."""
     
@@ -15,112 +121,158 @@ class DecisionRepository:
     async def get_by_id(self, decision_id: int, user_id: int) -> Decision | None:
         """Get decision by ID and user ID."""
         result = await self.db.execute(
-            select(Decision).where(
-                Decision.id == decision_id,
-                Decision.user_id == user_id
-            )
+            _STMT_BY_ID,
+            {'decision_id': decision_id, 'user_id': user_id}
         )
         return result.scalar_one_or_none()
     
+    async def exists(self, decision_id: int, user_id: int) -> bool:
+        """Check that a decision exists for a user without loading it."""
+        result = await self.db.execute(
+            _STMT_EXISTS,
+            {'decision_id': decision_id, 'user_id': user_id}
+        )
+        return result.scalar_one_or_none() is not None
+    
     async def list_by_user(
         self,
         user_id: int,
         status: str | None = None,
         action_type: str | None = None,
         limit: int = 100,
-        offset: int = 0
-    ) -> list[Decision]:
-        """List decisions for a user with optional filters."""
-        query = select(Decision).where(Decision.user_id == user_id)
+        offset: int = 0,
+        after: tuple[datetime, int] | None = None,
+    ) -> list[Row]:
+        """
+        List decisions for a user with optional filters, newest first.
+        
+        Rows carry only the columns of a decision listing; no ORM objects
+        are built. `after` is the (created_at, id) of the last decision on
+        the previous page; when given, the page starts right below it
+        instead of at `offset`.
+        """
+        query = select(*_LIST_COLUMNS).where(Decision.user_id == user_id)
         
         if status:
             query = query.where(Decision.webhook_status == status)
         if action_type:
             query = query.where(Decision.action_type == action_type)
+        if after:
+            # Keyset condition spelled out so MySQL can range-scan the index
+            after_created_at, after_id = after
+            query = query.where(
+                (Decision.created_at < after_created_at)
+                | ((Decision.created_at == after_created_at) & (Decision.id < after_id))
+            )
+        else:
+            query = query.offset(offset)
         
         result = await self.db.execute(
-            query.order_by(Decision.created_at.desc())
+            query.order_by(Decision.created_at.desc(), Decision.id.desc())
             .limit(limit)
-            .offset(offset)
         )
-        return list(result.scalars().all())
+        return list(result.all())
     
     async def create(self, decision: Decision) -> Decision:
         """Create a new decision."""
+        # The flush fills in the primary key and Python-side defaults; no
+        # column has a server default, so there is nothing to read back
         self.db.add(decision)
         await self.db.flush()
-        await self.db.refresh(decision)
         return decision
     
+    async def create_for_cost_record(
+        self,
+        cost_record_id: int,
+        rows: list[dict],
+    ) -> list[Decision]:
+        """
+        Create rule-generated decisions for a cost record in one statement.
+        
+        Rules that already produced a decision for the record are skipped;
+        the returned list holds the new and pre-existing decisions alike.
+        """
+        if not rows:
+            return []
+        
+        # No-op update on uq_decisions_cost_rule turns duplicates into skips
+        stmt = insert(Decision).values(rows)
+        await self.db.execute(
+            stmt.on_duplicate_key_update(id=Decision.__table__.c.id)
+        )
+        
+        result = await self.db.execute(
+            select(Decision).where(
+                Decision.cost_record_id == cost_record_id,
+                Decision.rule_id.in_([row['rule_id'] for row in rows])
+            )
+        )
+        return list(result.scalars().all())
+    
     async def update(self, decision: Decision) -> Decision:
         """Update a decision."""
+        # updated_at is stamped in Python by its onupdate hook during the flush
         await self.db.flush()
-        await self.db.refresh(decision)
         return decision
     
-    async def get_statistics(self, user_id: int) -> dict:
-        """Get decision statistics for a user."""
-        # Count by status
-        status_result = await self.db.execute(
-            select(
-                Decision.webhook_status,
-                func.count(Decision.id).label('count')
-            )
-            .where(Decision.user_id == user_id)
-            .group_by(Decision.webhook_status)
-        )
-        by_status = {row.webhook_status: row.count for row in status_result.all()}
-        
-        # Count by action type
-        action_result = await self.db.execute(
-            select(
-                Decision.action_type,
-                func.count(Decision.id).label('count')
-            )
-            .where(Decision.user_id == user_id)
-            .group_by(Decision.action_type)
-        )
-        by_action = {row.action_type: row.count for row in action_result.all()}
+    async def lock_webhook_deliveries(self, decision_ids: list[int]) -> set[int]:
+        """
+        Try to take the webhook delivery lock for each decision without waiting.
         
-        # Total estimated savings
-        savings_result = await self.db.execute(
-            select(func.sum(Decision.estimated_savings_monthly))
-            .where(
-                Decision.user_id == user_id,
-                Decision.dismissed_at == None
-            )
-        )
-        total_savings = savings_result.scalar() or 0
+        Locks belong to the session's connection until released, or until the
+        connection returns to the pool. Returns the ids that were locked; the
+        rest are being delivered elsewhere.
+        """
+        if not decision_ids:
+            return set()
         
-        # Pending approval count
-        pending = await self.db.execute(
-            select(func.count(Decision.id))
-            .where(
-                Decision.user_id == user_id,
-                Decision.approved_at == None,
-                Decision.dismissed_at == None,
-            )
+        connection = await self.db.connection()
+        connection.info[NAMED_LOCKS_KEY] = True
+        result = await self.db.execute(
+            select(*(
+                func.get_lock(f"{WEBHOOK_LOCK_PREFIX}{decision_id}", 0)
+                for decision_id in decision_ids
+            ))
         )
-        pending_count = pending.scalar() or 0
+        acquired = result.one()
+        return {
+            decision_id
+            for decision_id, locked in zip(decision_ids, acquired)
+            if locked == 1
+        }
+    
+    async def release_webhook_locks(self) -> None:
+        """Release every webhook delivery lock held by this session."""
+        await self.db.execute(select(func.release_all_locks()))
+        connection = await self.db.connection()
+        connection.info.pop(NAMED_LOCKS_KEY, None)
+    
+    async def get_statistics(self, user_id: int) -> dict:
+        """Get decision statistics for a user."""
+        result = await self.db.execute(_STMT_STATISTICS, {'user_id': user_id})
         
-        # Automated executions
-        automated = await self.db.execute(
-            select(func.count(Decision.id))
-            .where(
-                Decision.user_id == user_id,
-                Decision.is_automated == True,
-                Decision.executed_at != None,
-            )
-        )
-        automated_count = automated.scalar() or 0
+        by_status: dict[str, int] = {}
+        by_action: dict[str, int] = {}
+        totals = None
+        webhook_count = 0
+        for row in result:
+            if row.dim == 'status':
+                by_status[row.key] = row.count
+            elif row.dim == 'action':
+                by_action[row.key] = row.count
+            elif row.dim == 'totals':
+                totals = row
+            else:
+                webhook_count = row.count or 0
         
         return {
             'total': sum(by_status.values()),
             'by_status': by_status,
             'by_action_type': by_action,
-            'total_estimated_savings': total_savings,
-            'pending_approval': pending_count,
-            'automated_executions': automated_count,
+            'total_estimated_savings': (totals.savings if totals else None) or 0,
+            'pending_approval': (totals.count if totals else None) or 0,
+            'automated_executions': (totals.automated if totals else None) or 0,
+            'webhook_deliveries': webhook_count,
         }
 
 
@@ -130,17 +282,16 @@ class WebhookLogRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
     
-    async def get_by_decision(
+    async def get_by_decision_for_user(
         self,
         decision_id: int,
+        user_id: int,
         limit: int = 50
     ) -> list[WebhookLog]:
-        """Get webhook logs for a decision."""
+        """Get webhook logs for a decision owned by a user."""
         result = await self.db.execute(
-            select(WebhookLog)
-            .where(WebhookLog.decision_id == decision_id)
-            .order_by(WebhookLog.triggered_at.desc())
-            .limit(limit)
+            _STMT_WEBHOOK_LOGS_FOR_USER,
+            {'decision_id': decision_id, 'user_id': user_id, 'limit': limit}
         )
         return list(result.scalars().all())
     
@@ -150,3 +301,21 @@ class WebhookLogRepository:
         await self.db.flush()
         await self.db.refresh(log)
         return log
+    
+    async def create_many(self, logs: list[WebhookLog]) -> None:
+        """
+        Insert several webhook log entries with one multi-row statement.
+        
+        The logs are written through Core and are not added to the session,
+        so their primary keys stay unset.
+        """
+        if not logs:
+            return
+        
+        await self.db.execute(
+            insert(WebhookLog),
+            [
+                {column: getattr(log, column) for column in _WEBHOOK_LOG_COLUMNS}
+                for log in logs
+            ],
+        )
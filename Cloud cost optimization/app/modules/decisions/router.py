@@ -1,6 +1,6 @@
 """Decision and webhook API routes."""
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
@@ -31,22 +31,32 @@ async def get_statistics(
 
 @router.get("/", response_model=list[DecisionResponse])
 async def list_decisions(
+    response: Response,
     status: str | None = None,
     action_type: str | None = None,
     limit: int = 100,
     offset: int = 0,
+    cursor: str | None = None,
     current_user: dict = CurrentUserDependency,
     db: AsyncSession = Depends(get_db),
 ):
-    """List decisions for current user."""
+    """
+    List decisions for current user.
+    
+    Pass the X-Next-Cursor header of one page as `cursor` to fetch the next
+    page without the cost of a deep OFFSET.
+    """
     service = DecisionService(db)
-    decisions = await service.list_decisions(
+    decisions, next_cursor = await service.list_decisions(
         int(current_user["id"]),
         status,
         action_type,
         limit,
         offset,
+        cursor,
     )
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
     return decisions
 
 
@@ -119,11 +129,11 @@ async def deliver_webhook(
 ):
     """Trigger webhook delivery for a decision."""
     service = DecisionService(db)
-    logs = await service.deliver_webhook(int(current_user["id"]), decision_id)
+    result = await service.deliver_webhook(int(current_user["id"]), decision_id)
     return {
         'decision_id': decision_id,
-        'delivery_attempts': logs,
-        'status': 'completed' if any(l['status'] == 'success' for l in logs) else 'failed',
+        'delivery_attempts': result['logs'],
+        'status': 'completed' if result['delivered'] else 'failed',
     }
 
 
@@ -1,15 +1,17 @@
 """Business logic for decision generation and webhook management."""
 
+import base64
 from datetime import datetime, timezone
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.constants import DecisionAction
+from app.core.constants import DecisionAction, WebhookStatus
 from app.core.exceptions import ResourceNotFoundError, ValidationError
 from app.core.security import generate_webhook_secret
 from app.modules.classification.models import ClassificationResult
 from app.modules.cost.models import CostRecord
+from app.modules.dashboard.cache import invalidate_dashboard_cache_on_commit
 from app.modules.decisions.engine import RuleEngine
 from app.modules.decisions.models import Decision
 from app.modules.decisions.repository import DecisionRepository, WebhookLogRepository
@@ -17,9 +19,26 @@ from app.modules.decisions.schemas import (
     DecisionApproveRequest,
     DecisionCreateRequest,
     DecisionDismissRequest,
+    DecisionResponse,
     DecisionStatsResponse,
 )
-from app.modules.decisions.webhooks import WebhookDeliverer
+from app.modules.decisions.webhooks import get_webhook_deliverer
+
+
+def encode_cursor(decision: DecisionResponse) -> str:
+    """Encode a decision's (created_at, id) position as an opaque page cursor."""
+    raw = f"{decision.created_at.isoformat()}|{decision.id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode a page cursor produced by `encode_cursor`."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        created_at, decision_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(decision_id)
+    except ValueError:
+        raise ValidationError("Invalid pagination cursor")
 
 
 class DecisionService:
@@ -30,7 +49,7 @@ class DecisionService:
         self.repo = DecisionRepository(db)
         self.log_repo = WebhookLogRepository(db)
         self.engine = RuleEngine()
-        self.webhook_deliverer = WebhookDeliverer()
+        self.webhook_deliverer = get_webhook_deliverer()
     
     async def generate_decisions_from_cost(
         self,
@@ -42,29 +61,25 @@ class DecisionService:
         # Evaluate rules
         matches = self.engine.evaluate_record(cost_record, classification)
         
-        decisions = []
-        for match in matches:
-            # Check if decision already exists for this cost + rule
-            # (Skip duplicates)
-            
-            decision = Decision(
-                cost_record_id=cost_record.id,
-                user_id=user_id,
-                recommendation=match['recommendation'],
-                action_type=match['action'],
-                confidence=match['confidence'],
-                estimated_savings_monthly=match['estimated_savings_monthly'],
-                estimated_cost_to_implement=match['estimated_cost_to_implement'],
-                is_automated=match['auto_execute'],
-                rule_id=match['rule_id'],
-                rule_explanation=f"Matched rule: {match['rule_name']}",
-                context=match['context'],
-            )
-            
-            created = await self.repo.create(decision)
-            decisions.append(created)
+        rows = [
+            {
+                'cost_record_id': cost_record.id,
+                'user_id': user_id,
+                'recommendation': match['recommendation'],
+                'action_type': match['action'],
+                'confidence': match['confidence'],
+                'estimated_savings_monthly': match['estimated_savings_monthly'],
+                'estimated_cost_to_implement': match['estimated_cost_to_implement'],
+                'is_automated': match['auto_execute'],
+                'rule_id': match['rule_id'],
+                'rule_explanation': f"Matched rule: {match['rule_name']}",
+                'context': match['context'],
+            }
+            for match in matches
+        ]
         
-        return decisions
+        # Duplicates for the same cost record and rule are skipped by the database
+        return await self.repo.create_for_cost_record(cost_record.id, rows)
     
     async def create_manual_decision(
         self,
@@ -88,7 +103,9 @@ class DecisionService:
         if decision.webhook_url:
             decision.webhook_secret = generate_webhook_secret()
         
-        return await self.repo.create(decision)
+        created = await self.repo.create(decision)
+        invalidate_dashboard_cache_on_commit(self.db, user_id)
+        return created
     
     async def approve_decision(
         self,
@@ -116,6 +133,7 @@ class DecisionService:
                 decision.webhook_secret = generate_webhook_secret()
         
         await self.repo.update(decision)
+        invalidate_dashboard_cache_on_commit(self.db, user_id)
         
         # Trigger webhook delivery
         if decision.webhook_url:
@@ -143,14 +161,19 @@ class DecisionService:
         decision.dismiss_reason = data.reason
         
         await self.repo.update(decision)
+        invalidate_dashboard_cache_on_commit(self.db, user_id)
         return decision
     
     async def deliver_webhook(
         self,
         user_id: int,
         decision_id: int,
-    ) -> list[dict]:
-        """Deliver webhook for a decision."""
+    ) -> dict:
+        """
+        Deliver webhook for a decision.
+        
+        Returns the delivery attempts and whether any of them succeeded.
+        """
         decision = await self.repo.get_by_id(decision_id, user_id)
         if not decision:
             raise ResourceNotFoundError("Decision", str(decision_id))
@@ -158,26 +181,43 @@ class DecisionService:
         if not decision.webhook_url:
             raise ValidationError("No webhook URL configured for this decision")
         
-        # Deliver webhook
-        logs = await self.webhook_deliverer.deliver_with_retry(decision)
-        
-        # Save logs
-        for log in logs:
-            await self.log_repo.create(log)
+        # A concurrent delivery for this decision is already sending; report its status
+        if not await self.repo.lock_webhook_deliveries([decision_id]):
+            return {
+                'logs': [],
+                'delivered': decision.webhook_status == WebhookStatus.DELIVERED.value,
+            }
         
-        # Update decision with final status
-        await self.repo.update(decision)
+        try:
+            # Deliver webhook
+            logs = await self.webhook_deliverer.deliver_with_retry(decision)
+            
+            # Save logs
+            await self.log_repo.create_many(logs)
+            
+            # Update decision with final status
+            await self.repo.update(decision)
+        finally:
+            # The lock is released before the status commits, so it only dedups
+            # deliveries in flight at the same time. A failed flush leaves the
+            # session unable to run the release; the pool releases it instead.
+            if self.db.is_active:
+                await self.repo.release_webhook_locks()
         
-        return [
-            {
-                'attempt': log.attempt_number,
-                'status': log.status,
-                'status_code': log.status_code,
-                'error': log.error_message,
-                'duration_ms': log.duration_ms,
-            }
-            for log in logs
-        ]
+        return {
+            'logs': [
+                {
+                    'attempt': log.attempt_number,
+                    'status': log.status,
+                    'status_code': log.status_code,
+                    'error': log.error_message,
+                    'duration_ms': log.duration_ms,
+                }
+                for log in logs
+            ],
+            # The deliverer marks the decision delivered on the first successful attempt
+            'delivered': decision.webhook_status == WebhookStatus.DELIVERED.value,
+        }
     
     async def get_decision(
         self,
@@ -197,25 +237,27 @@ class DecisionService:
         action_type: str | None = None,
         limit: int = 100,
         offset: int = 0,
-    ) -> list[Decision]:
-        """List decisions for a user."""
-        return await self.repo.list_by_user(user_id, status, action_type, limit, offset)
+        cursor: str | None = None,
+    ) -> tuple[list[DecisionResponse], str | None]:
+        """
+        List decisions for a user.
+        
+        Returns the page and a cursor for the next one, or None on the last page.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        rows = await self.repo.list_by_user(
+            user_id, status, action_type, limit, offset, after
+        )
+        # Rows come straight from the database, so validation is skipped
+        decisions = [DecisionResponse.model_construct(**row._mapping) for row in rows]
+        
+        next_cursor = encode_cursor(decisions[-1]) if decisions and len(decisions) == limit else None
+        return decisions, next_cursor
     
     async def get_statistics(self, user_id: int) -> DecisionStatsResponse:
         """Get decision statistics."""
         stats = await self.repo.get_statistics(user_id)
         
-        # Count webhook deliveries
-        from sqlalchemy import select, func
-        from app.modules.decisions.models import WebhookLog
-        
-        result = await self.db.execute(
-            select(func.count(WebhookLog.id))
-            .join(Decision)
-            .where(Decision.user_id == user_id)
-        )
-        webhook_count = result.scalar() or 0
-        
         return DecisionStatsResponse(
             total_decisions=stats['total'],
             by_status=stats['by_status'],
@@ -223,7 +265,7 @@ class DecisionService:
             pending_approval=stats['pending_approval'],
             total_estimated_savings=stats['total_estimated_savings'],
             automated_executions=stats['automated_executions'],
-            webhook_deliveries=webhook_count,
+            webhook_deliveries=stats['webhook_deliveries'],
         )
     
     async def get_webhook_logs(
@@ -232,10 +274,10 @@ class DecisionService:
         decision_id: int,
     ) -> list[dict]:
         """Get webhook delivery logs for a decision."""
-        # Verify ownership
-        decision = await self.get_decision(user_id, decision_id)
-        
-        logs = await self.log_repo.get_by_decision(decision_id)
+        # Ownership is enforced by the join; only an empty result needs a second look
+        logs = await self.log_repo.get_by_decision_for_user(decision_id, user_id)
+        if not logs and not await self.repo.exists(decision_id, user_id):
+            raise ResourceNotFoundError("Decision", str(decision_id))
         
         return [
             {
@@ -2,9 +2,16 @@
 
 from celery import shared_task
 
-from app.core.database import AsyncSessionLocal
+from app.core.database import AsyncSessionLocal, commit_session
+from app.core.event_loop import run_async
+from app.modules.dashboard.cache import invalidate_dashboard_cache_on_commit
 from app.modules.decisions.service import DecisionService
 
+# Failed webhooks claimed per retry run
+RETRY_BATCH_SIZE = 100
+# Claims older than this are treated as abandoned by a crashed worker
+RETRY_CLAIM_TIMEOUT_SECONDS = 3600
+
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=30)
 def generate_decisions_for_cost_record(
@@ -25,24 +32,17 @@ def generate_decisions_for_cost_record(
     async def _generate():
         async with AsyncSessionLocal() as db:
             from app.modules.cost.repository import CostRepository
-            from app.modules.classification.repository import ClassificationRepository
             
-            # Get cost record
+            # Get cost record and its classification, if available
             cost_repo = CostRepository(db)
-            cost_record = await cost_repo.get_by_id(cost_record_id, user_id)
+            cost_record, classification = await cost_repo.get_with_classification(
+                cost_record_id,
+                user_id
+            )
             
             if not cost_record:
                 return {'error': f'Cost record {cost_record_id} not found'}
             
-            # Get classification if available
-            classification_repo = ClassificationRepository(db)
-            classification = None
-            if cost_record.metadata_record_id:
-                classification = await classification_repo.get_by_metadata(
-                    cost_record.metadata_record_id,
-                    user_id
-                )
-            
             # Generate decisions
             service = DecisionService(db)
             decisions = await service.generate_decisions_from_cost(
@@ -50,6 +50,9 @@ def generate_decisions_for_cost_record(
                 cost_record,
                 classification,
             )
+            if decisions:
+                invalidate_dashboard_cache_on_commit(db, user_id)
+            await commit_session(db)
             
             return {
                 'cost_record_id': cost_record_id,
@@ -57,9 +60,8 @@ def generate_decisions_for_cost_record(
                 'decision_ids': [d.id for d in decisions],
             }
     
-    import asyncio
     try:
-        return asyncio.run(_generate())
+        return run_async(_generate())
     except Exception as exc:
         try:
             self.retry(exc=exc)
@@ -80,56 +82,79 @@ def auto_execute_eligible_decisions() -> dict:
     """
     async def _execute():
         async with AsyncSessionLocal() as db:
-            from sqlalchemy import select
+            from sqlalchemy import select, update
             from datetime import datetime, timezone
             
             from app.modules.decisions.models import Decision
+            from app.modules.decisions.webhooks import get_webhook_deliverer
             
-            # Find eligible decisions
-            result = await db.execute(
-                select(Decision).where(
-                    Decision.is_automated == True,
-                    Decision.approved_at == None,
-                    Decision.dismissed_at == None,
-                    Decision.executed_at == None,
+            eligible_filter = (
+                Decision.is_automated == True,
+                Decision.approved_at == None,
+                Decision.dismissed_at == None,
+                Decision.executed_at == None,
+            )
+            now = datetime.now(timezone.utc)
+            
+            # Owners of the webhook-less decisions the bulk update is about to execute
+            bulk_users = await db.execute(
+                select(Decision.user_id)
+                .where(*eligible_filter, Decision.webhook_url == None)
+                .distinct()
+            )
+            user_ids = set(bulk_users.scalars().all())
+            
+            # Decisions without a webhook are approved and executed in one statement
+            bulk_result = await db.execute(
+                update(Decision)
+                .where(*eligible_filter, Decision.webhook_url == None)
+                .values(
+                    approved_at=now,
+                    approved_by='system-auto',
+                    executed_at=now,
+                    execution_result='Auto-executed successfully',
                 )
+                .execution_options(synchronize_session=False)
             )
-            eligible = result.scalars().all()
             
-            executed = 0
+            # Decisions with a webhook still need per-row delivery
+            result = await db.execute(
+                select(Decision).where(*eligible_filter, Decision.webhook_url != None)
+            )
+            with_webhook = result.scalars().all()
+            
+            executed = bulk_result.rowcount
             failed = 0
             
-            for decision in eligible:
-                try:
-                    # Auto-approve
-                    decision.approved_at = datetime.now(timezone.utc)
-                    decision.approved_by = 'system-auto'
-                    
-                    # Trigger webhook if configured
-                    if decision.webhook_url:
-                        from app.modules.decisions.webhooks import WebhookDeliverer
-                        deliverer = WebhookDeliverer()
-                        await deliverer.deliver_with_retry(decision)
-                    
+            # Auto-approve
+            for decision in with_webhook:
+                decision.approved_at = datetime.now(timezone.utc)
+                decision.approved_by = 'system-auto'
+            
+            outcomes = await get_webhook_deliverer().deliver_many(with_webhook)
+            
+            for decision, outcome in zip(with_webhook, outcomes):
+                if isinstance(outcome, BaseException):
+                    decision.execution_result = f'Auto-execution failed: {str(outcome)}'
+                    failed += 1
+                else:
                     # Mark as executed
                     decision.executed_at = datetime.now(timezone.utc)
                     decision.execution_result = 'Auto-executed successfully'
-                    
                     executed += 1
-                except Exception as e:
-                    decision.execution_result = f'Auto-execution failed: {str(e)}'
-                    failed += 1
             
-            await db.commit()
+            user_ids.update(decision.user_id for decision in with_webhook)
+            for user_id in user_ids:
+                invalidate_dashboard_cache_on_commit(db, user_id)
+            await commit_session(db)
             
             return {
-                'eligible': len(eligible),
+                'eligible': bulk_result.rowcount + len(with_webhook),
                 'executed': executed,
                 'failed': failed,
             }
     
-    import asyncio
-    return asyncio.run(_execute())
+    return run_async(_execute())
 
 
 @shared_task
@@ -137,34 +162,73 @@ def retry_failed_webhooks() -> dict:
     """Retry webhook deliveries that failed."""
     async def _retry():
         async with AsyncSessionLocal() as db:
-            from sqlalchemy import select
+            from datetime import datetime, timedelta, timezone
+            
+            from sqlalchemy import select, update
+            
+            from app.core.constants import WebhookStatus
             from app.modules.decisions.models import Decision
+            from app.modules.decisions.repository import DecisionRepository
+            from app.modules.decisions.webhooks import get_webhook_deliverer
+            
+            now = datetime.now(timezone.utc)
+            stale_claim = now - timedelta(seconds=RETRY_CLAIM_TIMEOUT_SECONDS)
             
-            # Find decisions with failed webhooks that haven't exhausted retries
+            # Claim a batch of failed webhooks that haven't exhausted retries;
+            # rows locked by an overlapping run are skipped rather than waited on
             result = await db.execute(
-                select(Decision).where(
-                    Decision.webhook_status == 'failed',
+                select(Decision)
+                .where(
                     Decision.webhook_attempts < 5,
                     Decision.dismissed_at == None,
+                    (Decision.webhook_status == WebhookStatus.FAILED.value)
+                    | (
+                        (Decision.webhook_status == WebhookStatus.RETRYING.value)
+                        & (Decision.webhook_last_attempt < stale_claim)
+                    ),
                 )
+                .order_by(Decision.webhook_last_attempt)
+                .limit(RETRY_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
             )
             failed = result.scalars().all()
             
-            retried = 0
+            if not failed:
+                return {
+                    'failed_count': 0,
+                    'retried': 0,
+                }
+            
+            # Marking the batch as retrying hides it from later runs once committed
+            await db.execute(
+                update(Decision)
+                .where(Decision.id.in_([d.id for d in failed]))
+                .values(
+                    webhook_status=WebhookStatus.RETRYING.value,
+                    webhook_last_attempt=now,
+                )
+            )
+            await db.commit()
+            
+            # Skip decisions whose webhook is being delivered by another worker
+            repo = DecisionRepository(db)
+            locked = await repo.lock_webhook_deliveries([d.id for d in failed])
+            try:
+                outcomes = await get_webhook_deliverer().deliver_many(
+                    [d for d in failed if d.id in locked]
+                )
+            finally:
+                await repo.release_webhook_locks()
             
-            for decision in failed:
-                try:
-                    from app.modules.decisions.webhooks import WebhookDeliverer
-                    deliverer = WebhookDeliverer()
-                    await deliverer.deliver_with_retry(decision)
-                    retried += 1
-                except Exception:
-                    pass  # Will be retried again
+            # Deliveries that fail again return to 'failed' for the next run
+            for user_id in {d.user_id for d in failed if d.id in locked}:
+                invalidate_dashboard_cache_on_commit(db, user_id)
+            await commit_session(db)
+            retried = sum(1 for outcome in outcomes if not isinstance(outcome, BaseException))
             
             return {
                 'failed_count': len(failed),
                 'retried': retried,
             }
     
-    import asyncio
-    return asyncio.run(_retry())
+    return run_async(_retry())
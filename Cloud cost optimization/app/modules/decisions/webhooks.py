@@ -1,81 +1,164 @@
 """Webhook delivery system with HMAC signatures and retry logic."""
 
+import asyncio
+import functools
 import hashlib
 import hmac
-import json
 import time
 from datetime import datetime, timezone
 
 import httpx
-from tenacity import (
-    retry,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_exponential,
-)
+import orjson
 
 from app.core.config import settings
 from app.core.exceptions import WebhookDeliveryError
 from app.modules.decisions.models import Decision, WebhookLog
 
 
+# Bounds (seconds) on the exponential backoff between network retries
+RETRY_MIN_DELAY = 1
+RETRY_MAX_DELAY = 60
+
+# Secrets with a cached HMAC key schedule
+HMAC_CACHE_SIZE = 1024
+
+# Webhook URLs kept pre-parsed between deliveries
+URL_CACHE_SIZE = 1024
+
+
+@functools.lru_cache(maxsize=HMAC_CACHE_SIZE)
+def _hmac_template(secret: str) -> hmac.HMAC:
+    """Keyed HMAC-SHA256 with no message yet; copy it to sign a payload."""
+    return hmac.new(secret.encode('utf-8'), digestmod=hashlib.sha256)
+
+
+@functools.lru_cache(maxsize=URL_CACHE_SIZE)
+def _parse_url(url: str) -> httpx.URL:
+    """Parse a webhook URL once; httpx reuses a URL instance without re-parsing."""
+    return httpx.URL(url)
+
+
+def _response_excerpt(response: httpx.Response, limit: int) -> str:
+    """First `limit` characters of a response body, decoding only the bytes needed."""
+    # A UTF-8 character is at most 4 bytes
+    return response.content[:limit * 4].decode('utf-8', 'replace')[:limit]
+
+
+@functools.lru_cache(maxsize=1)
+def _iso_second(second: int) -> bytes:
+    """ISO 8601 UTC date and time for a whole epoch second."""
+    return datetime.fromtimestamp(second, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S').encode('ascii')
+
+
+def _utc_timestamp() -> bytes:
+    """Current UTC time as ISO 8601 bytes, formatting each second only once."""
+    now = time.time()
+    second = int(now)
+    return b'%s.%06d+00:00' % (_iso_second(second), int((now - second) * 1_000_000))
+
+
 class WebhookDeliverer:
     """Handles webhook delivery with signing and retries."""
     
+    _EVENT_NAME = 'cost_optimization_recommendation'
+    _BASE_HEADERS = {
+        'Content-Type': 'application/json',
+        'X-Webhook-Event': _EVENT_NAME,
+        'X-Webhook-Version': '1.0',
+    }
+    _PAYLOAD_PREFIX = b'{"event":"' + _EVENT_NAME.encode('ascii') + b'","timestamp":"'
+    
     def __init__(self):
         self.timeout = settings.WEBHOOK_TIMEOUT_SECONDS
         self.max_retries = settings.WEBHOOK_MAX_RETRIES
+        self._client: httpx.AsyncClient | None = None
+        self._client_loop: asyncio.AbstractEventLoop | None = None
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the pooled HTTP client, creating it on first use in this event loop."""
+        loop = asyncio.get_running_loop()
+        # A client's connections belong to the loop that opened them
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=settings.WEBHOOK_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.WEBHOOK_MAX_KEEPALIVE_CONNECTIONS,
+                ),
+            )
+            self._client_loop = loop
+        return self._client
+    
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._client_loop = None
     
     def _generate_signature(self, payload: bytes, secret: str) -> str:
         """Generate HMAC-SHA256 signature for webhook payload."""
-        return hmac.new(
-            secret.encode('utf-8'),
-            payload,
-            hashlib.sha256
-        ).hexdigest()
+        # Copying the template skips re-deriving the padded inner/outer keys
+        signer = _hmac_template(secret).copy()
+        signer.update(payload)
+        return signer.hexdigest()
     
-    def _build_payload(self, decision: Decision) -> dict:
-        """Build webhook payload from decision."""
-        return {
-            'event': 'cost_optimization_recommendation',
-            'timestamp': datetime.now(timezone.utc).isoformat(),
-            'decision': {
+    def _build_payload_bytes(self, decision: Decision) -> bytes:
+        """Serialize the webhook payload for a decision."""
+        # Only the decision object goes through orjson; the envelope around
+        # it is constant apart from the timestamp
+        decision_json = orjson.dumps(
+            {
                 'id': decision.id,
                 'recommendation': decision.recommendation,
                 'action_type': decision.action_type,
                 'confidence': decision.confidence,
-                'estimated_savings_monthly': str(decision.estimated_savings_monthly) if decision.estimated_savings_monthly else None,
+                'estimated_savings_monthly': decision.estimated_savings_monthly,
                 'is_automated': decision.is_automated,
                 'context': decision.context,
             },
-        }
+            default=str,  # Decimal amounts
+        )
+        return b''.join((
+            self._PAYLOAD_PREFIX, _utc_timestamp(),
+            b'","decision":', decision_json,
+            b'}',
+        ))
     
-    @retry(
-        retry=retry_if_exception_type((httpx.NetworkError, httpx.TimeoutException)),
-        stop=stop_after_attempt(settings.WEBHOOK_MAX_RETRIES),
-        wait=wait_exponential(multiplier=settings.WEBHOOK_RETRY_BACKOFF_BASE, min=1, max=60),
-        reraise=True,
-    )
     async def _send_request(
         self,
         url: str,
         payload: bytes,
         signature: str,
+        idempotency_key: str,
     ) -> httpx.Response:
-        """Send webhook request with retries."""
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.post(
-                url,
-                content=payload,
-                headers={
-                    'Content-Type': 'application/json',
-                    settings.WEBHOOK_SECRET_HEADER: signature,
-                    'X-Webhook-Event': 'cost_optimization_recommendation',
-                    'X-Webhook-Version': '1.0',
-                },
-            )
-            response.raise_for_status()
-            return response
+        """
+        Send webhook request with retries.
+        
+        Network errors and timeouts are retried with exponential backoff;
+        HTTP error statuses are raised immediately. Every retry carries the
+        same Idempotency-Key so receivers can drop duplicates unverified.
+        """
+        client = self._get_client()
+        target = _parse_url(url)
+        headers = self._BASE_HEADERS | {
+            settings.WEBHOOK_SECRET_HEADER: signature,
+            'Idempotency-Key': idempotency_key,
+        }
+        
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                response = await client.post(target, content=payload, headers=headers)
+                break
+            except (httpx.NetworkError, httpx.TimeoutException):
+                if attempt == self.max_retries:
+                    raise
+                delay = settings.WEBHOOK_RETRY_BACKOFF_BASE * (2 ** (attempt - 1))
+                await asyncio.sleep(min(RETRY_MAX_DELAY, max(RETRY_MIN_DELAY, delay)))
+        
+        response.raise_for_status()
+        return response
     
     async def deliver(
         self,
@@ -91,8 +174,7 @@ class WebhookDeliverer:
             raise WebhookDeliveryError("No webhook URL configured")
         
         # Build payload
-        payload_dict = self._build_payload(decision)
-        payload_bytes = json.dumps(payload_dict, default=str).encode('utf-8')
+        payload_bytes = self._build_payload_bytes(decision)
         
         # Generate signature
         secret = decision.webhook_secret or settings.SECRET_KEY
@@ -103,11 +185,12 @@ class WebhookDeliverer:
             decision_id=decision.id,
             attempt_number=attempt_number,
             status='pending',
-            request_payload=payload_bytes.decode('utf-8'),
+            request_payload=payload_bytes,
             triggered_at=datetime.now(timezone.utc),
         )
         
-        start_time = time.time()
+        # Monotonic, so wall-clock adjustments can't skew the duration
+        start_mono = time.monotonic()
         
         try:
             # Send request
@@ -115,35 +198,28 @@ class WebhookDeliverer:
                 decision.webhook_url,
                 payload_bytes,
                 signature,
+                f"{decision.id}:{attempt_number}",
             )
             
             # Success
-            duration_ms = int((time.time() - start_time) * 1000)
-            
             webhook_log.status = 'success'
             webhook_log.status_code = response.status_code
-            webhook_log.response_body = response.text[:1000]  # Limit size
-            webhook_log.completed_at = datetime.now(timezone.utc)
-            webhook_log.duration_ms = duration_ms
+            webhook_log.response_body = _response_excerpt(response, 1000)
             
         except httpx.HTTPStatusError as e:
             # HTTP error (4xx, 5xx)
-            duration_ms = int((time.time() - start_time) * 1000)
-            
             webhook_log.status = 'failure'
             webhook_log.status_code = e.response.status_code
-            webhook_log.error_message = f"HTTP {e.response.status_code}: {e.response.text[:500]}"
-            webhook_log.completed_at = datetime.now(timezone.utc)
-            webhook_log.duration_ms = duration_ms
+            webhook_log.error_message = f"HTTP {e.response.status_code}: {_response_excerpt(e.response, 500)}"
             
         except Exception as e:
             # Network or other error
-            duration_ms = int((time.time() - start_time) * 1000)
-            
             webhook_log.status = 'failure'
             webhook_log.error_message = str(e)[:500]
+        
+        finally:
+            webhook_log.duration_ms = int((time.monotonic() - start_mono) * 1000)
             webhook_log.completed_at = datetime.now(timezone.utc)
-            webhook_log.duration_ms = duration_ms
         
         return webhook_log
     
@@ -164,7 +240,8 @@ class WebhookDeliverer:
             
             # Update decision status
             decision.webhook_attempts = attempt
-            decision.webhook_last_attempt = datetime.now(timezone.utc)
+            # Same instant as the attempt's log entry
+            decision.webhook_last_attempt = log.completed_at or log.triggered_at
             
             if log.status == 'success':
                 decision.webhook_status = 'delivered'
@@ -175,3 +252,45 @@ class WebhookDeliverer:
                 decision.webhook_error = log.error_message
         
         return logs
+    
+    async def deliver_many(
+        self,
+        decisions: list[Decision],
+    ) -> list[list[WebhookLog] | BaseException]:
+        """
+        Deliver webhooks for several decisions concurrently.
+        
+        Returns one entry per decision: its delivery attempts, or the
+        exception that aborted delivery.
+        """
+        # A sliding window: a slow receiver holds one slot, not a whole batch
+        semaphore = asyncio.Semaphore(settings.WEBHOOK_MAX_CONCURRENCY)
+        
+        async def deliver_one(decision: Decision) -> list[WebhookLog]:
+            async with semaphore:
+                return await self.deliver_with_retry(decision)
+        
+        return await asyncio.gather(
+            *(deliver_one(decision) for decision in decisions),
+            return_exceptions=True,
+        )
+
+
+# Process-wide deliverer so deliveries share one connection pool
+_webhook_deliverer: WebhookDeliverer | None = None
+
+
+def get_webhook_deliverer() -> WebhookDeliverer:
+    """Get or create the shared webhook deliverer."""
+    global _webhook_deliverer
+    if _webhook_deliverer is None:
+        _webhook_deliverer = WebhookDeliverer()
+    return _webhook_deliverer
+
+
+async def close_webhook_deliverer():
+    """Close the shared webhook deliverer's HTTP client."""
+    global _webhook_deliverer
+    if _webhook_deliverer:
+        await _webhook_deliverer.aclose()
+        _webhook_deliverer = None
@@ -2,7 +2,7 @@
 
 from datetime import datetime, timezone
 
-from sqlalchemy import JSON, Boolean, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import JSON, Boolean, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.constants import IngestionStatus
@@ -47,7 +47,9 @@ class DataSource(Base):
         "IngestionJob",
         back_populates="data_source",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        # Never serialized with the source; DataSourceRepository.delete removes jobs in bulk
+        lazy="raise_on_sql",
+        passive_deletes=True,
     )
 
 
@@ -55,6 +57,10 @@ class IngestionJob(Base):
     """Individual ingestion job tracking."""
     
     __tablename__ = "ingestion_jobs"
+    __table_args__ = (
+        # Recent-job listings and per-period job counts for the dashboard
+        Index("ix_ingestion_user_created", "user_id", "created_at", "status", "file_size"),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(
@@ -94,21 +100,25 @@ class IngestionJob(Base):
     
     # Relationships
     data_source: Mapped[DataSource | None] = relationship("DataSource", back_populates="ingestion_jobs")
+    # Child rows are opt-in via selectinload; deletes rely on ON DELETE CASCADE
     metadata_records: Mapped[list["MetadataRecord"]] = relationship(
         "MetadataRecord",
         back_populates="ingestion_job",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        lazy="raise_on_sql",
+        passive_deletes=True,
     )
     classification_results: Mapped[list["ClassificationResult"]] = relationship(
         "ClassificationResult",
         back_populates="ingestion_job",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        lazy="raise_on_sql",
+        passive_deletes=True,
     )
     cost_records: Mapped[list["CostRecord"]] = relationship(
         "CostRecord",
         back_populates="ingestion_job",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        lazy="raise_on_sql",
+        passive_deletes=True,
     )
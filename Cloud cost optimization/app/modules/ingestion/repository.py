@@ -1,11 +1,22 @@
 """Database access layer for ingestion operations."""
 
-from sqlalchemy import select
+from sqlalchemy import bindparam, delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.modules.ingestion.models import DataSource, IngestionJob
 
 
+# Lookups hit on every status poll are built once; values are bound per call
+_STMT_SOURCE_BY_ID = select(DataSource).where(
+    DataSource.id == bindparam('source_id'),
+    DataSource.user_id == bindparam('user_id')
+)
+_STMT_JOB_BY_ID = select(IngestionJob).where(
+    IngestionJob.id == bindparam('job_id'),
+    IngestionJob.user_id == bindparam('user_id')
+)
+
+
 class DataSourceRepository:
     """Repository for data source operations."""
     
@@ -15,10 +26,8 @@ class DataSourceRepository:
     async def get_by_id(self, source_id: int, user_id: int) -> DataSource | None:
         """Get data source by ID and user ID."""
         result = await self.db.execute(
-            select(DataSource).where(
-                DataSource.id == source_id,
-                DataSource.user_id == user_id
-            )
+            _STMT_SOURCE_BY_ID,
+            {'source_id': source_id, 'user_id': user_id}
         )
         return result.scalar_one_or_none()
     
@@ -39,7 +48,11 @@ class DataSourceRepository:
         return data_source
     
     async def delete(self, data_source: DataSource) -> None:
-        """Delete a data source."""
+        """Delete a data source and its ingestion jobs."""
+        # The FK is SET NULL, so jobs are removed explicitly rather than loaded for the ORM cascade
+        await self.db.execute(
+            delete(IngestionJob).where(IngestionJob.data_source_id == data_source.id)
+        )
         await self.db.delete(data_source)
         await self.db.flush()
     
@@ -59,10 +72,8 @@ class IngestionJobRepository:
     async def get_by_id(self, job_id: int, user_id: int) -> IngestionJob | None:
         """Get ingestion job by ID and user ID."""
         result = await self.db.execute(
-            select(IngestionJob).where(
-                IngestionJob.id == job_id,
-                IngestionJob.user_id == user_id
-            )
+            _STMT_JOB_BY_ID,
+            {'job_id': job_id, 'user_id': user_id}
         )
         return result.scalar_one_or_none()
     
@@ -34,19 +34,8 @@ async def upload_file(
     Upload a file for ingestion (CSV, JSON billing exports).
     Max file size: 100MB
     """
-    # Validate file size
     max_size = settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
     
-    # Read file content
-    content = await file.read()
-    file_size = len(content)
-    
-    if file_size > max_size:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File too large. Maximum size: {settings.MAX_UPLOAD_SIZE_MB}MB",
-        )
-    
     # Validate file type
     allowed_types = [
         'text/csv',
@@ -77,18 +66,24 @@ async def upload_file(
     # Ensure upload directory exists
     file_path.parent.mkdir(parents=True, exist_ok=True)
     
-    # Save file
-    with open(file_path, "wb") as f:
-        f.write(content)
+    # Save file in chunks, hashing it and enforcing the size limit as it streams
+    service = IngestionService(db)
+    saved = await service.save_upload(file.file, str(file_path), max_size)
+    if saved is None:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File too large. Maximum size: {settings.MAX_UPLOAD_SIZE_MB}MB",
+        )
+    file_size, checksum = saved
     
     # Create ingestion job
-    service = IngestionService(db)
     job = await service.process_file_upload(
         user_id=int(current_user["id"]),
         file_path=str(file_path),
         original_filename=file.filename,
         mime_type=file.content_type or 'application/octet-stream',
         file_size=file_size,
+        checksum=checksum,
     )
     
     return FileUploadResponse(
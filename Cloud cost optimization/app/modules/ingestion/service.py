@@ -1,20 +1,30 @@
 """Business logic for data ingestion and file processing."""
 
+import asyncio
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from operator import itemgetter
 from pathlib import Path
+from typing import BinaryIO
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.constants import IngestionStatus
+from app.core.database import rollback_session
 from app.core.exceptions import ProcessingError, ResourceNotFoundError, ValidationError
+from app.modules.dashboard.cache import invalidate_dashboard_cache_on_commit
 from app.modules.ingestion.models import DataSource, IngestionJob
 from app.modules.ingestion.repository import DataSourceRepository, IngestionJobRepository
 from app.modules.ingestion.schemas import DataSourceCreateRequest
 from app.modules.metadata.collector import MetadataCollector
-from app.modules.metadata.models import MetadataRecord
+from app.modules.metadata.repository import MetadataRepository
+
+
+# Extracted record batches buffered between the parse and store stages
+PIPELINE_QUEUE_SIZE = 8
 
 
 class IngestionService:
@@ -24,6 +34,7 @@ class IngestionService:
         self.db = db
         self.source_repo = DataSourceRepository(db)
         self.job_repo = IngestionJobRepository(db)
+        self.metadata_repo = MetadataRepository(db)
         self.metadata_collector = MetadataCollector()
     
     async def create_data_source(
@@ -73,6 +84,24 @@ class IngestionService:
         
         await self.source_repo.delete(source)
     
+    async def save_upload(
+        self,
+        source: BinaryIO,
+        file_path: str,
+        max_size: int,
+    ) -> tuple[int, str] | None:
+        """
+        Stream an uploaded file to disk off the event loop.
+        
+        Returns (size, checksum), or None if the file exceeds max_size bytes.
+        """
+        return await asyncio.to_thread(
+            self.metadata_collector.save_with_checksum,
+            source,
+            file_path,
+            max_size,
+        )
+    
     async def process_file_upload(
         self,
         user_id: int,
@@ -80,14 +109,16 @@ class IngestionService:
         original_filename: str,
         mime_type: str,
         file_size: int,
+        checksum: str | None = None,
     ) -> IngestionJob:
         """Process an uploaded file and create ingestion job."""
         # Create upload directory if needed
         upload_dir = Path(settings.UPLOAD_DIR)
         upload_dir.mkdir(parents=True, exist_ok=True)
         
-        # Compute checksum
-        checksum = self.metadata_collector.compute_checksum(file_path)
+        # Compute checksum unless it was taken while saving
+        if checksum is None:
+            checksum = await asyncio.to_thread(self.metadata_collector.compute_checksum, file_path)
         
         # Create job record
         job = IngestionJob(
@@ -113,6 +144,7 @@ class IngestionService:
         # Update with task ID
         created_job.celery_task_id = task.id
         await self.job_repo.update(created_job)
+        invalidate_dashboard_cache_on_commit(self.db, user_id)
         
         return created_job
     
@@ -137,27 +169,65 @@ class IngestionService:
         job = await self.job_repo.get_by_id(job_id, job_id)  # Will be fixed by actual user context
         if not job:
             raise ResourceNotFoundError("Ingestion Job", str(job_id))
+        user_id = job.user_id
         
         try:
             # Update status to processing
             await self.job_repo.update_status(job_id, IngestionStatus.PROCESSING.value)
             
-            # Extract metadata
-            records, info = self.metadata_collector.extract_metadata(
-                job.file_path,
-                job.mime_type,
-                job.user_id,
-                job.id
-            )
+            # Parse in a worker thread while the previous batch is being stored
+            format_type = self.metadata_collector.detect_file_format(job.file_path, job.mime_type)
+            batches: asyncio.Queue[list[dict] | None] = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+            stats = {'malformed_rows': 0}
+            
+            async def extract_stage() -> None:
+                extracted = self.metadata_collector.iter_metadata(
+                    job.file_path,
+                    format_type,
+                    job.user_id,
+                    job.id,
+                    stats,
+                )
+                loop = asyncio.get_running_loop()
+                # A single parser thread, so the close below waits for a next()
+                # still running when the stage is cancelled
+                with ThreadPoolExecutor(max_workers=1) as parser:
+                    try:
+                        while (records := await loop.run_in_executor(parser, next, extracted, None)) is not None:
+                            await batches.put(records)
+                        await batches.put(None)
+                    finally:
+                        # Close the shard writer and source file now, not at GC
+                        await loop.run_in_executor(parser, extracted.close)
             
-            # Store metadata records
             stored_count = 0
-            for record_data in records:
-                metadata_record = MetadataRecord(**record_data)
-                self.db.add(metadata_record)
-                stored_count += 1
+            providers: set[str] = set()
+            entity_types: set[str] = set()
             
-            await self.db.flush()
+            async def store_stage() -> None:
+                nonlocal stored_count
+                while (records := await batches.get()) is not None:
+                    stored_count += await self.metadata_repo.bulk_create(records)
+                    # All records of a file share its detected provider
+                    if records[0]['provider']:
+                        providers.add(records[0]['provider'])
+                    entity_types.update(map(itemgetter('entity_type'), records))
+            
+            # A failing stage cancels the other; surface its own error
+            try:
+                async with asyncio.TaskGroup() as stages:
+                    stages.create_task(extract_stage())
+                    stages.create_task(store_stage())
+            except ExceptionGroup as group:
+                raise group.exceptions[0]
+            
+            info = {
+                'format_detected': format_type,
+                'records_extracted': stored_count,
+                'providers_detected': list(providers),
+                'entity_types': list(entity_types),
+                'malformed_rows': stats['malformed_rows'],
+            }
             
             # Update job with results
             await self.job_repo.update_status(
@@ -167,8 +237,10 @@ class IngestionService:
                     'records_extracted': stored_count,
                     'providers_detected': info.get('providers_detected', []),
                     'entity_types': info.get('entity_types', []),
+                    'malformed_rows': info.get('malformed_rows', 0),
                 }
             )
+            invalidate_dashboard_cache_on_commit(self.db, user_id)
             
             return {
                 'status': 'completed',
@@ -177,11 +249,18 @@ class IngestionService:
             }
             
         except Exception as e:
+            # Keep none of the failed run's records, only its failed status
+            await rollback_session(self.db)
+            try:
+                os.remove(self.metadata_collector.raw_shard_path(job_id))
+            except OSError:
+                pass  # No shard was written
             await self.job_repo.update_status(
                 job_id,
                 IngestionStatus.FAILED.value,
                 error_message=str(e)
             )
+            invalidate_dashboard_cache_on_commit(self.db, user_id)
             raise ProcessingError(f"Job processing failed: {str(e)}")
     
     def cleanup_old_data(self, days: int) -> dict:
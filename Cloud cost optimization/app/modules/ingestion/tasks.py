@@ -1,15 +1,33 @@
 """Celery tasks for background ingestion processing."""
 
+import asyncio
+import os
+
 from celery import shared_task
 from celery.exceptions import MaxRetriesExceededError
 
 from app.core.constants import IngestionStatus
-from app.core.database import AsyncSessionLocal
+from app.core.database import AsyncSessionLocal, commit_session
+from app.core.event_loop import run_async
 from app.modules.ingestion.repository import IngestionJobRepository
 from app.modules.ingestion.service import IngestionService
+from app.modules.metadata.collector import MetadataCollector
 from celery_worker import celery_app
 
 
+# Upload files unlinked concurrently during cleanup
+UNLINK_BATCH_SIZE = 64
+
+
+def _remove_file(file_path: str) -> bool:
+    """Remove a file, returning whether it existed and was removed."""
+    try:
+        os.remove(file_path)
+        return True
+    except OSError:
+        return False  # File may not exist or permission denied
+
+
 @shared_task(bind=True, max_retries=3, default_retry_delay=60)
 def process_ingestion_job(self, job_id: int) -> dict:
     """
@@ -26,6 +44,7 @@ def process_ingestion_job(self, job_id: int) -> dict:
             service = IngestionService(db)
             try:
                 result = await service.process_job(job_id)
+                await commit_session(db)
                 return result
             except Exception as exc:
                 # Update job status to failed
@@ -35,11 +54,11 @@ def process_ingestion_job(self, job_id: int) -> dict:
                     IngestionStatus.FAILED.value,
                     error_message=str(exc)
                 )
+                await commit_session(db)
                 raise exc
     
-    import asyncio
     try:
-        return asyncio.run(_process())
+        return run_async(_process())
     except Exception as exc:
         # Retry on failure
         try:
@@ -73,31 +92,31 @@ def cleanup_old_data(retention_days: int = 90) -> dict:
             
             # Find old completed/failed jobs
             result = await db.execute(
-                select(IngestionJob).where(
+                select(IngestionJob.id, IngestionJob.file_path).where(
                     IngestionJob.created_at < cutoff_date,
                     IngestionJob.status.in_(['completed', 'failed'])
                 )
             )
-            old_jobs = result.scalars().all()
-            
-            jobs_deleted = 0
-            files_removed = 0
-            
-            for job in old_jobs:
-                # Delete associated file
-                if job.file_path:
-                    import os
-                    try:
-                        if os.path.exists(job.file_path):
-                            os.remove(job.file_path)
-                            files_removed += 1
-                    except OSError:
-                        pass  # File may not exist or permission denied
-                
-                await db.delete(job)
-                jobs_deleted += 1
+            old_jobs = result.all()
             
+            # One DELETE; child rows go with ON DELETE CASCADE
+            if old_jobs:
+                await db.execute(
+                    delete(IngestionJob).where(IngestionJob.id.in_([job.id for job in old_jobs]))
+                )
             await db.commit()
+            jobs_deleted = len(old_jobs)
+            
+            # Delete uploads and raw-row shards once the rows are gone
+            collector = MetadataCollector()
+            paths = [job.file_path for job in old_jobs if job.file_path]
+            paths.extend(collector.raw_shard_path(job.id) for job in old_jobs)
+            files_removed = 0
+            for offset in range(0, len(paths), UNLINK_BATCH_SIZE):
+                removed = await asyncio.gather(
+                    *(asyncio.to_thread(_remove_file, path) for path in paths[offset:offset + UNLINK_BATCH_SIZE])
+                )
+                files_removed += sum(removed)
             
             return {
                 'jobs_deleted': jobs_deleted,
@@ -106,5 +125,4 @@ def cleanup_old_data(retention_days: int = 90) -> dict:
                 'cutoff_date': cutoff_date.isoformat(),
             }
     
-    import asyncio
-    return asyncio.run(_cleanup())
+    return run_async(_cleanup())
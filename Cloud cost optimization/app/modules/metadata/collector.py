@@ -1,15 +1,68 @@
 """Metadata extraction and collection logic."""
 
+import codecs
 import csv
+import functools
 import hashlib
+import io
+import itertools
 import json
-from datetime import datetime
-from typing import Any
+import os
+import re
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from operator import itemgetter
+from typing import Any, BinaryIO
 
-import magic
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from pyarrow import csv as pa_csv
 
+from app.core.config import settings
 from app.core.constants import CloudProvider
 
+# Bytes per read when copying or hashing files
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# Bytes of CSV parsed into each Arrow record batch
+CSV_BLOCK_SIZE = 8 * 1024 * 1024
+
+# Rows per record batch when the csv module parses a file instead of Arrow
+CSV_FALLBACK_BATCH_ROWS = 64 * 1024
+
+# Rows per row group in a job's raw-row Parquet shard
+RAW_ROW_GROUP_SIZE = 64 * 1024
+
+# Distinct timestamp strings kept parsed; billing periods repeat across rows
+TIMESTAMP_CACHE_SIZE = 8192
+
+
+@functools.lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def _parse_timestamp_text(value: str) -> datetime | None:
+    """Parse a timestamp string in any supported format, caching by input."""
+    text = value.strip()
+    
+    # ISO 8601 (AWS, GCP) is parsed in C without trying formats in turn
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        pass
+    else:
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+    
+    # US-style dates; the time part decides the single format to try
+    if '/' in text:
+        fmt = '%m/%d/%Y %H:%M:%S' if ' ' in text else '%m/%d/%Y'
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            pass
+    
+    return None
+
 
 class MetadataCollector:
     """Extracts metadata from various data formats (CSV, JSON, billing exports)."""
@@ -59,54 +112,63 @@ class MetadataCollector:
         'ResourceLocation': 'region',
     }
     
+    # Lower-cased headers that identify each provider's export, checked in order
+    PROVIDER_HEADER_PATTERNS = (
+        (CloudProvider.AWS.value, frozenset({'line_item_resource_id', 'bill_payer_account_id', 'line_item_product_code'})),
+        (CloudProvider.GCP.value, frozenset({'project_id', 'service_description', 'sku_description'})),
+        (CloudProvider.AZURE.value, frozenset({'resourceid', 'subscriptionid', 'metercategory'})),
+    )
+    
+    # Format dispatch tables; the MIME type is checked before the extension
+    MIME_FORMATS = {
+        'text/csv': 'csv',
+        'application/json': 'json',
+        'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': 'xlsx',
+        'application/vnd.ms-excel': 'xls',
+        'application/gzip': 'gz',
+        'application/zip': 'zip',
+        'text/plain': 'txt',
+    }
+    
+    EXTENSION_FORMATS = {
+        '.csv': 'csv',
+        '.json': 'json',
+        '.xlsx': 'xlsx',
+        '.xls': 'xlsx',
+        '.gz': 'gz',
+        '.zip': 'zip',
+    }
+    
+    # Service type substrings per entity type, checked in order
+    ENTITY_TYPE_PATTERNS = (
+        ('storage_bucket', ('S3', 'BUCKET', 'STORAGE', 'BLOB')),
+        ('compute_instance', ('EC2', 'COMPUTE', 'VM', 'INSTANCE')),
+        ('database', ('RDS', 'DATABASE', 'SQL', 'DYNAMODB')),
+        ('serverless_function', ('LAMBDA', 'FUNCTION', 'SERVERLESS')),
+        ('network_resource', ('VPC', 'LOADBALANCER', 'CDN', 'TRANSFER')),
+    )
+    # One alternation per entity type, so RE2 scans each value once per category
+    _ENTITY_TYPE_REGEXES = tuple(
+        (entity_type, '|'.join(re.escape(pattern) for pattern in patterns))
+        for entity_type, patterns in ENTITY_TYPE_PATTERNS
+    )
+    
     def detect_file_format(self, file_path: str, mime_type: str) -> str:
         """Detect the format of the input file."""
-        mime_mapping = {
-            'text/csv': 'csv',
-            'application/json': 'json',
-            'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': 'xlsx',
-            'application/vnd.ms-excel': 'xls',
-            'application/gzip': 'gz',
-            'application/zip': 'zip',
-            'text/plain': 'txt',
-        }
-        
-        detected = mime_mapping.get(mime_type)
+        detected = self.MIME_FORMATS.get(mime_type)
         if detected:
             return detected
         
         # Fallback: check file extension
-        if file_path.endswith('.csv'):
-            return 'csv'
-        elif file_path.endswith('.json'):
-            return 'json'
-        elif file_path.endswith(('.xlsx', '.xls')):
-            return 'xlsx'
-        elif file_path.endswith('.gz'):
-            return 'gz'
-        elif file_path.endswith('.zip'):
-            return 'zip'
-        
-        return 'unknown'
+        return self.EXTENSION_FORMATS.get(os.path.splitext(file_path)[1], 'unknown')
     
     def detect_provider(self, headers: list[str], sample_data: dict) -> str:
         """Detect cloud provider from data headers and sample."""
-        header_set = set(h.lower() for h in headers)
-        
-        # Check for AWS patterns
-        aws_patterns = ['line_item_resource_id', 'bill_payer_account_id', 'line_item_product_code']
-        if any(p in header_set for p in aws_patterns):
-            return CloudProvider.AWS.value
+        header_set = frozenset(map(str.lower, headers))
         
-        # Check for GCP patterns
-        gcp_patterns = ['project.id', 'service.description', 'sku.description']
-        if any(p.lower().replace('.', '_') in header_set for p in gcp_patterns):
-            return CloudProvider.GCP.value
-        
-        # Check for Azure patterns
-        azure_patterns = ['resourceid', 'subscriptionid', 'metercategory']
-        if any(p in header_set for p in azure_patterns):
-            return CloudProvider.AZURE.value
+        for provider, patterns in self.PROVIDER_HEADER_PATTERNS:
+            if not header_set.isdisjoint(patterns):
+                return provider
         
         return CloudProvider.OTHER.value
     
@@ -117,10 +179,27 @@ class MetadataCollector:
         job_id: int
     ) -> list[dict]:
         """Extract metadata from CSV billing export."""
-        metadata_records = []
+        return [
+            record
+            for records in self.iter_csv_metadata(file_path, user_id, job_id)
+            for record in records
+        ]
+    
+    def iter_csv_metadata(
+        self,
+        file_path: str,
+        user_id: int,
+        job_id: int,
+        stats: dict[str, int] | None = None,
+    ) -> Iterator[list[dict]]:
+        """
+        Extract metadata from CSV billing export, one record batch at a time.
         
+        Rows with more or fewer fields than the header are kept, as
+        csv.DictReader kept them, and counted in stats['malformed_rows'].
+        """
+        # Detect dialect from a sample and read the full header row, however wide
         with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-            # Detect dialect
             sample = f.read(8192)
             f.seek(0)
             sniffer = csv.Sniffer()
@@ -129,31 +208,200 @@ class MetadataCollector:
             except csv.Error:
                 dialect = csv.excel
             
-            reader = csv.DictReader(f, dialect=dialect)
-            headers = reader.fieldnames or []
-            
-            # Detect provider from first row
-            first_row = next(reader, None)
-            if not first_row:
-                return []
-            
-            provider = self.detect_provider(headers, first_row)
-            field_mapping = self._get_field_mapping(provider)
-            
-            # Process first row
-            records = self._process_row(first_row, headers, field_mapping, provider, user_id, job_id)
-            metadata_records.extend(records)
-            
-            # Process remaining rows
-            row_count = 1
-            for row in reader:
-                if row_count >= 10000:  # Limit for demo, process in chunks in production
-                    break
-                records = self._process_row(row, headers, field_mapping, provider, user_id, job_id)
-                metadata_records.extend(records)
-                row_count += 1
+            headers = next(csv.reader(f, dialect=dialect), None)
+        if not headers:
+            return
+        
+        schema = pa.schema([pa.field(name, pa.string()) for name in headers])
+        
+        # Tag/label headers in various formats:
+        # AWS: resourceTags/user:Name, user:Environment
+        # GCP: labels.key
+        # Azure: Tags
+        tag_columns = [key for key in headers if 'tag' in key.lower() or 'label' in key.lower()]
+        
+        # Source rows go to a columnar shard; records keep their offset into it
+        raw_path = self.raw_shard_path(job_id) if settings.METADATA_STORE_RAW_ROWS else None
+        raw_writer = None
+        row_offset = 0
+        
+        if dialect.skipinitialspace:
+            # Arrow can't skip the spaces after a delimiter (and before a quote)
+            batches = self._csv_module_batches(file_path, dialect, schema, stats)
+        else:
+            batches = self._arrow_batches(file_path, headers, dialect, schema, stats)
+        
+        provider = None
+        columns = {}
+        try:
+            for batch in batches:
+                if batch.num_rows == 0:
+                    continue
+                
+                # Detect provider from first row
+                if provider is None:
+                    provider = self.detect_provider(headers, batch.slice(0, 1).to_pylist()[0])
+                    columns = self._map_columns(headers, self._get_field_mapping(provider))
+                
+                if raw_path:
+                    if raw_writer is None:
+                        os.makedirs(os.path.dirname(raw_path), exist_ok=True)
+                        raw_writer = pq.ParquetWriter(raw_path, schema)
+                    raw_writer.write_batch(batch, row_group_size=RAW_ROW_GROUP_SIZE)
+                
+                records = self._process_batch(
+                    batch, columns, tag_columns, provider, user_id, job_id,
+                    raw_path, row_offset,
+                )
+                row_offset += batch.num_rows
+                if records:
+                    yield records
+        finally:
+            batches.close()
+            if raw_writer is not None:
+                raw_writer.close()
+    
+    def _arrow_batches(
+        self,
+        file_path: str,
+        headers: list[str],
+        dialect: type[csv.Dialect] | csv.Dialect,
+        schema: pa.Schema,
+        stats: dict[str, int] | None,
+    ) -> Iterator[pa.RecordBatch]:
+        """
+        Parse a CSV file with Arrow, one record batch at a time.
+        
+        Arrow only reads UTF-8. If it meets invalid bytes, the file is read
+        again transcoded with the bytes replaced, as the csv module read
+        them, skipping the rows already yielded. Rows of the wrong width
+        are re-read with csv and yielded after the rest.
+        """
+        malformed = []
+        
+        def collect_malformed(row: pa_csv.InvalidRow) -> str:
+            malformed.append(row.text)
+            return 'skip'
+        
+        transcode = False
+        yielded = 0
+        while True:
+            malformed.clear()
+            skip = yielded
+            source = self._open_csv_source(file_path, transcode)
+            try:
+                reader = pa_csv.open_csv(
+                    source,
+                    read_options=pa_csv.ReadOptions(
+                        block_size=CSV_BLOCK_SIZE,
+                        # Name the columns from the header row and skip Arrow past it
+                        column_names=headers,
+                        skip_rows_after_names=1,
+                    ),
+                    parse_options=pa_csv.ParseOptions(
+                        delimiter=dialect.delimiter,
+                        quote_char=dialect.quotechar or False,
+                        double_quote=dialect.doublequote,
+                        escape_char=dialect.escapechar or False,
+                        newlines_in_values=True,  # Quoted cells may span lines, as csv allows
+                        invalid_row_handler=collect_malformed,
+                    ),
+                    # Keep every value a string, as csv.DictReader returned them
+                    convert_options=pa_csv.ConvertOptions(
+                        column_types={name: pa.string() for name in headers},
+                    ),
+                )
+                for batch in reader:
+                    if skip >= batch.num_rows:
+                        skip -= batch.num_rows
+                        continue
+                    batch, skip = batch.slice(skip), 0
+                    yielded += batch.num_rows
+                    yield batch
+            except pa.ArrowInvalid:
+                # Invalid UTF-8, in a value or in a row of the wrong width
+                if transcode:
+                    raise
+                transcode = True
+                continue
+            finally:
+                if isinstance(source, pa.NativeFile):
+                    source.close()
+            break
+        
+        if malformed:
+            if stats is not None:
+                stats['malformed_rows'] = stats.get('malformed_rows', 0) + len(malformed)
+            yield self._rows_batch(
+                [
+                    fields
+                    for text in malformed
+                    for fields in csv.reader(io.StringIO(text), dialect=dialect)
+                ],
+                schema,
+            )
+    
+    def _csv_module_batches(
+        self,
+        file_path: str,
+        dialect: type[csv.Dialect] | csv.Dialect,
+        schema: pa.Schema,
+        stats: dict[str, int] | None,
+    ) -> Iterator[pa.RecordBatch]:
+        """Parse a CSV file with the csv module, for dialects Arrow can't read."""
+        width = len(schema)
+        with open(file_path, 'r', encoding='utf-8', errors='replace', newline='') as f:
+            # Blank lines are skipped, as csv.DictReader skipped them
+            rows = filter(None, csv.reader(f, dialect=dialect))
+            next(rows, None)  # Header
+            while chunk := list(itertools.islice(rows, CSV_FALLBACK_BATCH_ROWS)):
+                if stats is not None:
+                    stats['malformed_rows'] = (
+                        stats.get('malformed_rows', 0)
+                        + sum(len(fields) != width for fields in chunk)
+                    )
+                yield self._rows_batch(chunk, schema)
+    
+    def _rows_batch(self, rows: list[list[str]], schema: pa.Schema) -> pa.RecordBatch:
+        """
+        Build a batch of the file's schema from rows parsed by the csv module.
+        
+        Missing fields become null and extra fields are dropped, matching
+        the values csv.DictReader gave the header's columns.
+        """
+        width = len(schema)
+        rows = [(fields + [None] * width)[:width] for fields in rows]
+        return pa.RecordBatch.from_arrays(
+            [pa.array([row[i] for row in rows], pa.string()) for i in range(width)],
+            schema=schema,
+        )
+    
+    def raw_shard_path(self, job_id: int) -> str:
+        """Path of the Parquet shard holding a job's source rows."""
+        return os.path.join(settings.UPLOAD_DIR, 'raw', f'job_{job_id}.parquet')
+    
+    def _open_csv_source(self, file_path: str, transcode: bool = False) -> str | pa.NativeFile:
+        """
+        Open a CSV file for Arrow to parse.
+        
+        With transcode, invalid UTF-8 is replaced on the way in. Otherwise
+        large files are memory-mapped so Arrow parses their pages in place.
+        """
+        if transcode:
+            return pa.PythonFile(
+                codecs.EncodedFile(open(file_path, 'rb'), 'utf-8', errors='replace'),
+                mode='r',
+            )
+        if not settings.USE_MMAP_CSV:
+            return file_path
+        if os.path.getsize(file_path) < settings.MMAP_CSV_MIN_SIZE_MB * 1024 * 1024:
+            return file_path
         
-        return metadata_records
+        source = pa.memory_map(file_path, 'r')
+        # Start readahead of the whole file before the parser reaches it
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(source.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+        return source
     
     def _get_field_mapping(self, provider: str) -> dict:
         """Get field mapping for a provider."""
@@ -164,146 +412,198 @@ class MetadataCollector:
         }
         return mappings.get(provider, {})
     
-    def _process_row(
+    def _map_columns(self, headers: list[str], field_mapping: dict) -> dict[str, str]:
+        """Map fields to the columns present in a file, once per file."""
+        header_set = set(headers)
+        return {
+            mapped_key: raw_key
+            for raw_key, mapped_key in field_mapping.items()
+            if raw_key in header_set
+        }
+    
+    def _process_batch(
         self,
-        row: dict,
-        headers: list[str],
-        field_mapping: dict,
+        batch: pa.RecordBatch,
+        columns: dict[str, str],
+        tag_columns: list[str],
         provider: str,
         user_id: int,
-        job_id: int
+        job_id: int,
+        raw_path: str | None,
+        row_offset: int,
     ) -> list[dict]:
-        """Process a single data row into metadata records."""
-        records = []
+        """
+        Process a batch of data rows into metadata records.
         
-        # Map fields
-        mapped = {}
-        for raw_key, mapped_key in field_mapping.items():
-            if raw_key in row:
-                mapped[mapped_key] = row[raw_key]
+        With a raw_path, records point at their source row in that shard,
+        which starts this batch at row_offset.
+        """
+        # Skip rows without a resource_id
+        if 'resource_id' not in columns:
+            return []
+        # Fields missing from malformed rows are null and count as empty
+        resource_ids = pc.utf8_trim_whitespace(pc.fill_null(batch.column(columns['resource_id']), ''))
+        has_resource = pc.not_equal(resource_ids, '')
+        batch = batch.filter(has_resource)
+        if batch.num_rows == 0:
+            return []
+        resource_ids = resource_ids.filter(has_resource)
         
-        # Skip if no resource_id
-        resource_id = mapped.get('resource_id', '').strip()
-        if not resource_id:
-            return records
+        if raw_path:
+            source_path = raw_path
+            raw_offsets = pc.add(pc.indices_nonzero(has_resource), row_offset).to_pylist()
+        else:
+            source_path = f'job_{job_id}'
+            raw_offsets = itertools.repeat(None)
         
         # Determine entity type from service_type
-        service_type = mapped.get('service_type', '').upper()
-        entity_type = self._determine_entity_type(service_type)
-        
-        # Extract attributes
-        attributes = self._extract_attributes(mapped, service_type, provider)
-        
-        # Extract tags
-        tags = self._extract_tags(row)
-        
-        # Build period timestamps
-        period_start = self._parse_timestamp(mapped.get('usage_start'))
-        period_end = self._parse_timestamp(mapped.get('usage_end'))
-        
-        record = {
-            'ingestion_job_id': job_id,
-            'user_id': user_id,
-            'entity_type': entity_type,
-            'entity_id': resource_id,
-            'provider': provider,
-            'region': mapped.get('region'),
-            'account_id': mapped.get('account_id'),
-            'attributes': attributes,
-            'tags': tags,
-            'source_path': f'job_{job_id}',
-            'raw_data': row,
-            'resource_created_at': period_start,
-            'resource_updated_at': period_end,
-        }
+        if 'service_type' in columns:
+            service_types = pc.utf8_upper(pc.fill_null(batch.column(columns['service_type']), ''))
+        else:
+            service_types = pa.array([''] * batch.num_rows, pa.string())
+        entity_types = self._determine_entity_types(service_types)
+        
+        attribute_fields = self._attribute_fields(columns, provider)
+        
+        # Mapped fields and tags come out column-wise and are zipped back per row
+        mapped_keys = tuple(columns)
+        mapped_rows = zip(*(batch.column(columns[key]).to_pylist() for key in mapped_keys))
+        if tag_columns:
+            tag_rows = zip(*(batch.column(key).to_pylist() for key in tag_columns))
+        else:
+            tag_rows = itertools.repeat(())
+        
+        records = []
+        for values, tag_values, raw_offset, resource_id, service_type, entity_type in zip(
+            mapped_rows,
+            tag_rows,
+            raw_offsets,
+            resource_ids.to_pylist(),
+            service_types.to_pylist(),
+            entity_types.to_pylist(),
+        ):
+            mapped = dict(zip(mapped_keys, values))
+            
+            # Build period timestamps
+            period_start = self._parse_timestamp(mapped.get('usage_start'))
+            period_end = self._parse_timestamp(mapped.get('usage_end'))
+            
+            records.append({
+                'ingestion_job_id': job_id,
+                'user_id': user_id,
+                'entity_type': entity_type,
+                'entity_id': resource_id,
+                'provider': provider,
+                'region': mapped.get('region'),
+                'account_id': mapped.get('account_id'),
+                'attributes': self._extract_attributes(mapped, service_type, attribute_fields),
+                'tags': self._extract_tags(tag_columns, tag_values),
+                'source_path': source_path,
+                'raw_offset': raw_offset,
+                'resource_created_at': period_start,
+                'resource_updated_at': period_end,
+            })
         
-        records.append(record)
         return records
     
-    def _determine_entity_type(self, service_type: str) -> str:
-        """Determine entity type from service type."""
-        service_type_upper = service_type.upper()
-        
-        if any(s in service_type_upper for s in ['S3', 'BUCKET', 'STORAGE', 'BLOB']):
-            return 'storage_bucket'
-        elif any(s in service_type_upper for s in ['EC2', 'COMPUTE', 'VM', 'INSTANCE']):
-            return 'compute_instance'
-        elif any(s in service_type_upper for s in ['RDS', 'DATABASE', 'SQL', 'DYNAMODB']):
-            return 'database'
-        elif any(s in service_type_upper for s in ['LAMBDA', 'FUNCTION', 'SERVERLESS']):
-            return 'serverless_function'
-        elif any(s in service_type_upper for s in ['VPC', 'LOADBALANCER', 'CDN', 'TRANSFER']):
-            return 'network_resource'
-        else:
-            return 'billing_entry'
+    def _determine_entity_types(self, service_types: pa.Array) -> pa.Array:
+        """Determine entity types from upper-cased service types."""
+        entity_types = pa.array(['billing_entry'] * len(service_types), pa.string())
+        
+        # Apply the last category first so earlier categories take precedence
+        for entity_type, pattern in reversed(self._ENTITY_TYPE_REGEXES):
+            matched = pc.match_substring_regex(service_types, pattern)
+            entity_types = pc.if_else(matched, entity_type, entity_types)
+        
+        return entity_types
     
-    def _extract_attributes(self, mapped: dict, service_type: str, provider: str) -> dict:
-        """Extract technical attributes from mapped data."""
-        attributes = {
-            'service_type': service_type,
-            'usage_type': mapped.get('usage_type'),
-            'operation': mapped.get('operation'),
-            'usage_quantity': mapped.get('usage_quantity'),
-            'cost_amount': mapped.get('cost_amount'),
-            'currency': mapped.get('currency', 'USD'),
-        }
+    def _attribute_fields(self, columns: dict[str, str], provider: str) -> tuple[tuple[str, str | None], ...]:
+        """
+        Resolve which mapped fields become attributes, once per batch.
+        
+        Returns (field, default) pairs in attribute order; fields absent
+        from the file are dropped unless they have a default.
+        """
+        fields = [
+            ('usage_type', None),
+            ('operation', None),
+            ('usage_quantity', None),
+            ('cost_amount', None),
+            ('currency', 'USD'),
+        ]
         
         # Add provider-specific attributes
         if provider == CloudProvider.AWS.value:
-            attributes['availability_zone'] = mapped.get('availability_zone')
+            fields.append(('availability_zone', None))
         elif provider == CloudProvider.GCP.value:
-            attributes['sku_description'] = mapped.get('sku_description')
+            fields.append(('sku_description', None))
         elif provider == CloudProvider.AZURE.value:
-            attributes['resource_group'] = mapped.get('resource_group')
-            attributes['meter_subcategory'] = mapped.get('meter_subcategory')
+            fields.append(('resource_group', None))
+            fields.append(('meter_subcategory', None))
         
-        # Remove None values
-        return {k: v for k, v in attributes.items() if v is not None}
+        return tuple(
+            (field, default)
+            for field, default in fields
+            if field in columns or default is not None
+        )
+    
+    def _extract_attributes(
+        self,
+        mapped: dict,
+        service_type: str,
+        attribute_fields: tuple[tuple[str, str | None], ...],
+    ) -> dict:
+        """Extract technical attributes from mapped data."""
+        attributes = {'service_type': service_type}
+        for field, default in attribute_fields:
+            value = mapped.get(field, default)
+            # Skip None values
+            if value is not None:
+                attributes[field] = value
+        return attributes
     
-    def _extract_tags(self, row: dict) -> dict:
-        """Extract resource tags from row data."""
-        tags = {}
-        
-        # Look for tag columns in various formats
-        for key, value in row.items():
-            key_lower = key.lower()
-            # AWS: resourceTags/user:Name, user:Environment
-            # GCP: labels.key
-            # Azure: Tags
-            if 'tag' in key_lower or 'label' in key_lower:
-                if value:
-                    tags[key] = value
-        
-        return tags
+    def _extract_tags(self, tag_columns: list[str], values: tuple) -> dict:
+        """Extract resource tags from a row's tag column values."""
+        return {key: value for key, value in zip(tag_columns, values) if value}
     
     def _parse_timestamp(self, value: Any) -> datetime | None:
         """Parse timestamp from various formats."""
         if not value:
             return None
-        
-        formats = [
-            '%Y-%m-%dT%H:%M:%SZ',
-            '%Y-%m-%d %H:%M:%S',
-            '%Y-%m-%d',
-            '%m/%d/%Y %H:%M:%S',
-            '%m/%d/%Y',
-        ]
-        
-        for fmt in formats:
-            try:
-                return datetime.strptime(str(value).strip(), fmt)
-            except ValueError:
-                continue
-        
-        return None
+        return _parse_timestamp_text(str(value))
     
     def compute_checksum(self, file_path: str) -> str:
         """Compute SHA-256 checksum of file."""
-        sha256_hash = hashlib.sha256()
+        # file_digest reads into a reused buffer in C, releasing the GIL while hashing
         with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
+            return hashlib.file_digest(f, "sha256").hexdigest()
+    
+    def save_with_checksum(
+        self,
+        source: BinaryIO,
+        file_path: str,
+        max_size: int,
+    ) -> tuple[int, str] | None:
+        """
+        Copy a file object to disk in chunks, computing its SHA-256 on the way.
+        
+        Returns (size, checksum), or None if the data exceeds max_size bytes;
+        the partial file is removed in that case.
+        """
+        sha256_hash = hashlib.sha256()
+        size = 0
+        with open(file_path, "wb") as f:
+            for chunk in iter(lambda: source.read(COPY_CHUNK_SIZE), b""):
+                size += len(chunk)
+                if size > max_size:
+                    break
+                sha256_hash.update(chunk)
+                f.write(chunk)
+        
+        if size > max_size:
+            os.remove(file_path)
+            return None
+        return size, sha256_hash.hexdigest()
     
     def extract_metadata(
         self,
@@ -320,19 +620,37 @@ class MetadataCollector:
         """
         format_type = self.detect_file_format(file_path, mime_type)
         
-        if format_type == 'csv':
-            records = self.extract_csv_metadata(file_path, user_id, job_id)
-        elif format_type == 'json':
-            # TODO: Implement JSON extraction
-            records = []
-        else:
-            records = []
+        # Summaries are gathered per batch rather than by rescanning every record;
+        # all records of a file share its detected provider
+        records = []
+        providers = set()
+        entity_types = set()
+        stats = {'malformed_rows': 0}
+        for batch in self.iter_metadata(file_path, format_type, user_id, job_id, stats):
+            records.extend(batch)
+            if batch[0]['provider']:
+                providers.add(batch[0]['provider'])
+            entity_types.update(map(itemgetter('entity_type'), batch))
         
         processing_info = {
             'format_detected': format_type,
             'records_extracted': len(records),
-            'providers_detected': list(set(r.get('provider') for r in records if r.get('provider'))),
-            'entity_types': list(set(r.get('entity_type') for r in records)),
+            'providers_detected': list(providers),
+            'entity_types': list(entity_types),
+            'malformed_rows': stats['malformed_rows'],
         }
         
         return records, processing_info
+    
+    def iter_metadata(
+        self,
+        file_path: str,
+        format_type: str,
+        user_id: int,
+        job_id: int,
+        stats: dict[str, int] | None = None,
+    ) -> Iterator[list[dict]]:
+        """Extract metadata from a file of a detected format, in batches."""
+        if format_type == 'csv':
+            yield from self.iter_csv_metadata(file_path, user_id, job_id, stats)
+        # TODO: Implement JSON extraction
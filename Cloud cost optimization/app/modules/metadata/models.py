@@ -53,7 +53,7 @@ class MetadataRecord(Base):
     resource_updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     # Raw source reference
     source_path: Mapped[str | None] = mapped_column(String(500), nullable=True)
-    raw_data: Mapped[dict | None] = mapped_column(JSON, nullable=True)  # Original row/data
+    raw_offset: Mapped[int | None] = mapped_column(Integer, nullable=True)  # Row in the source_path Parquet shard
     
     # Relationships
     ingestion_job: Mapped["IngestionJob"] = relationship("IngestionJob", back_populates="metadata_records")
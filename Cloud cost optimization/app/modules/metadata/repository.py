@@ -1,11 +1,33 @@
 """Database access layer for metadata operations."""
 
+import asyncio
+
+import pyarrow.parquet as pq
 from sqlalchemy import func, select
+from sqlalchemy.dialects.mysql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.modules.metadata.models import MetadataRecord
 
 
+# Rows per multi-row INSERT when storing extracted metadata
+BULK_INSERT_BATCH_SIZE = 1000
+
+
+def _read_shard_row(path: str, offset: int) -> dict | None:
+    """Read one row of a Parquet shard, decoding only the row group holding it."""
+    try:
+        with pq.ParquetFile(path) as shard:
+            for group in range(shard.num_row_groups):
+                group_rows = shard.metadata.row_group(group).num_rows
+                if offset < group_rows:
+                    return shard.read_row_group(group).slice(offset, 1).to_pylist()[0]
+                offset -= group_rows
+    except FileNotFoundError:
+        pass
+    return None
+
+
 class MetadataRepository:
     """Repository for metadata record operations."""
     
@@ -91,6 +113,30 @@ class MetadataRepository:
         await self.db.refresh(metadata_record)
         return metadata_record
     
+    async def bulk_create(self, records: list[dict]) -> int:
+        """
+        Insert metadata records from column dicts, bypassing the ORM.
+        
+        Returns the number of rows written. Records are not added to the
+        session, so no identities or generated IDs are loaded back.
+        """
+        for offset in range(0, len(records), BULK_INSERT_BATCH_SIZE):
+            await self.db.execute(
+                insert(MetadataRecord),
+                records[offset:offset + BULK_INSERT_BATCH_SIZE],
+            )
+        return len(records)
+    
+    async def get_raw_row(self, metadata_record: MetadataRecord) -> dict | None:
+        """Get the source row a metadata record was extracted from, if it was kept."""
+        if metadata_record.raw_offset is None or not metadata_record.source_path:
+            return None
+        return await asyncio.to_thread(
+            _read_shard_row,
+            metadata_record.source_path,
+            metadata_record.raw_offset,
+        )
+    
     async def delete(self, metadata_record: MetadataRecord) -> None:
         """Delete a metadata record."""
         await self.db.delete(metadata_record)
@@ -1,6 +1,7 @@
 """Celery worker entry point and task discovery."""
 
 from celery import Celery
+from celery.signals import worker_process_init
 
 from app.core.config import settings
 
@@ -13,6 +14,7 @@ celery_app = Celery(
         "app.modules.ingestion.tasks",
         "app.modules.classification.tasks",
         "app.modules.decisions.tasks",
+        "app.modules.dashboard.tasks",
     ],
 )
 
@@ -25,7 +27,7 @@ celery_app.conf.update(
     enable_utc=True,
     task_track_started=True,
     task_time_limit=3600,  # 1 hour max per task
-    worker_prefetch_multiplier=1,
+    worker_prefetch_multiplier=settings.CELERY_PREFETCH_MULTIPLIER,  # Messages reserved per process
     task_acks_late=True,
     result_expires=86400,  # Results expire after 24 hours
 )
@@ -36,7 +38,23 @@ celery_app.conf.beat_schedule = {
         "task": "app.modules.ingestion.tasks.cleanup_old_data",
         "schedule": 86400.0,  # Run daily
     },
+    "dashboard-summary-refresh": {
+        "task": "app.modules.dashboard.tasks.refresh_dashboard_summaries",
+        "schedule": float(settings.DASHBOARD_SUMMARY_REFRESH_SECONDS),
+    },
 }
 
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """Give each forked worker its own event loop and database pool."""
+    from app.core.database import engine
+    from app.core.event_loop import get_worker_loop
+    
+    # Connections inherited from the parent must not be shared across processes
+    engine.sync_engine.dispose(close=False)
+    get_worker_loop()
+
+
 if __name__ == "__main__":
     celery_app.start()
@@ -0,0 +1,404 @@
+"""Billing export extraction tests against the original per-row CSV behaviour."""
+
+from datetime import datetime
+from pathlib import Path
+
+import pyarrow.parquet as pq
+import pytest
+
+from app.core.config import settings
+from app.modules.metadata.collector import MetadataCollector
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+JAN_1 = datetime(2024, 1, 1)
+JAN_2 = datetime(2024, 1, 2)
+JAN_1_1AM = datetime(2024, 1, 1, 1)
+
+# Records the csv.DictReader implementation produced for each fixture
+EXPECTED_RECORDS = {
+    "aws": [
+        {
+            "entity_type": "storage_bucket",
+            "entity_id": "arn:aws:s3:::logs-bucket",
+            "region": "us-east-1",
+            "account_id": "001122334455",
+            "attributes": {
+                "service_type": "AMAZONS3",
+                "usage_type": "TimedStorage-ByteHrs",
+                "operation": "StandardStorage",
+                "usage_quantity": "12.5",
+                "cost_amount": "1.50",
+                "currency": "USD",
+                "availability_zone": "",
+            },
+            "tags": {"resourceTags/user:Name": "logs", "resourceTags/user:Environment": "prod"},
+            "resource_created_at": JAN_1,
+            "resource_updated_at": JAN_2,
+        },
+        {
+            "entity_type": "compute_instance",
+            "entity_id": "i-0abc123def456",
+            "region": "us-east-1",
+            "account_id": "001122334455",
+            "attributes": {
+                "service_type": "AMAZONEC2",
+                "usage_type": "BoxUsage:t3.micro",
+                "operation": "RunInstances",
+                "usage_quantity": "24",
+                "cost_amount": "0.2496",
+                "currency": "USD",
+                "availability_zone": "us-east-1a",
+            },
+            "tags": {"resourceTags/user:Name": "web\nserver"},
+            "resource_created_at": JAN_1,
+            "resource_updated_at": JAN_2,
+        },
+        {
+            "entity_type": "database",
+            "entity_id": "db-prod-1",
+            "region": "us-east-1",
+            "account_id": "001122334455",
+            "attributes": {
+                "service_type": "AMAZONRDS",
+                "usage_type": "InstanceUsage:db.t3.small",
+                "operation": "CreateDBInstance",
+                "usage_quantity": "24",
+                "cost_amount": "0.816",
+                "currency": "USD",
+                "availability_zone": "us-east-1b",
+            },
+            "tags": {"resourceTags/user:Environment": "prod"},
+            "resource_created_at": JAN_1,
+            "resource_updated_at": JAN_2,
+        },
+        {
+            "entity_type": "serverless_function",
+            "entity_id": "arn:aws:lambda:us-east-1:001122334455:function:resize",
+            "region": "us-east-1",
+            "account_id": "001122334455",
+            "attributes": {
+                "service_type": "AWSLAMBDA",
+                "usage_type": "Request",
+                "operation": "Invoke",
+                "usage_quantity": "1000",
+                "cost_amount": "0.0002",
+                "currency": "",
+                "availability_zone": "",
+            },
+            "tags": {},
+            "resource_created_at": JAN_1,
+            "resource_updated_at": None,
+        },
+        {
+            "entity_type": "network_resource",
+            "entity_id": "nat-0a1b2c",
+            "region": "us-east-1",
+            "account_id": "001122334455",
+            "attributes": {
+                "service_type": "AMAZONVPC",
+                "usage_type": "NatGateway-Hours",
+                "operation": "NatGateway",
+                "usage_quantity": "24",
+                "cost_amount": "1.08",
+                "currency": "USD",
+                "availability_zone": "",
+            },
+            "tags": {},
+            "resource_created_at": JAN_1,
+            "resource_updated_at": JAN_2,
+        },
+        {
+            "entity_type": "compute_instance",
+            "entity_id": "sp-123",
+            "region": "",
+            "account_id": "001122334455",
+            "attributes": {
+                "service_type": "COMPUTESAVINGSPLANS",
+                "usage_type": "SavingsPlanCoveredUsage",
+                "operation": "",
+                "usage_quantity": "1",
+                "cost_amount": "0",
+                "currency": "USD",
+                "availability_zone": "",
+            },
+            "tags": {},
+            "resource_created_at": JAN_1,
+            "resource_updated_at": JAN_2,
+        },
+    ],
+    "gcp": [
+        {
+            "entity_type": "compute_instance",
+            "entity_id": "projects/my-project/instances/vm-1",
+            "region": "us-central1-a",
+            "account_id": "my-project",
+            "attributes": {
+                "service_type": "COMPUTE ENGINE",
+                "cost_amount": "0.031611",
+                "currency": "USD",
+                "sku_description": "N1 Predefined Instance Core",
+            },
+            "tags": {"labels.env": "prod", "labels.team": "platform"},
+            "resource_created_at": JAN_1,
+            "resource_updated_at": JAN_1_1AM,
+        },
+        {
+            "entity_type": "storage_bucket",
+            "entity_id": "projects/my-project/buckets/assets",
+            "region": "us",
+            "account_id": "my-project",
+            "attributes": {
+                "service_type": "CLOUD STORAGE",
+                "cost_amount": "0.026",
+                "currency": "USD",
+                "sku_description": "Standard Storage US Multi-region",
+            },
+            "tags": {"labels.team": "web"},
+            "resource_created_at": JAN_1,
+            "resource_updated_at": JAN_2,
+        },
+        {
+            "entity_type": "database",
+            "entity_id": "projects/my-project/instances/sql-1",
+            "region": "us-central1",
+            "account_id": "my-project",
+            "attributes": {
+                "service_type": "CLOUD SQL",
+                "cost_amount": "0.0413",
+                "currency": "USD",
+                "sku_description": "DB custom CORE",
+            },
+            "tags": {"labels.env": "prod"},
+            "resource_created_at": JAN_1,
+            "resource_updated_at": JAN_1_1AM,
+        },
+        {
+            "entity_type": "serverless_function",
+            "entity_id": "projects/my-project/functions/thumb",
+            "region": "europe-west1",
+            "account_id": "my-project",
+            "attributes": {
+                "service_type": "CLOUD FUNCTIONS",
+                "cost_amount": "0.0004",
+                "currency": "EUR",
+                "sku_description": "Invocations",
+            },
+            "tags": {"labels.env": "dev", "labels.team": "media"},
+            "resource_created_at": JAN_1,
+            "resource_updated_at": JAN_2,
+        },
+    ],
+    "azure": [
+        {
+            "entity_type": "billing_entry",
+            "entity_id": "/subscriptions/1/resourceGroups/rg-web/providers/Microsoft.Compute/virtualMachines/vm-web",
+            "region": "eastus",
+            "account_id": "00000000-0000-0000-0000-000000000001",
+            "attributes": {
+                "service_type": "VIRTUAL MACHINES",
+                "cost_amount": "4.61",
+                "currency": "USD",
+                "resource_group": "rg-web",
+            },
+            "tags": {"Tags": "env:prod"},
+            "resource_created_at": JAN_1,
+            "resource_updated_at": JAN_2,
+        },
+        {
+            "entity_type": "storage_bucket",
+            "entity_id": "/subscriptions/1/resourceGroups/rg-data/providers/Microsoft.Storage/storageAccounts/sadata",
+            "region": "eastus",
+            "account_id": "00000000-0000-0000-0000-000000000001",
+            "attributes": {
+                "service_type": "STORAGE",
+                "cost_amount": "0.52",
+                "currency": "USD",
+                "resource_group": "rg-data",
+            },
+            "tags": {},
+            "resource_created_at": JAN_1,
+            "resource_updated_at": JAN_2,
+        },
+        {
+            "entity_type": "database",
+            "entity_id": "/subscriptions/1/resourceGroups/rg-data/providers/Microsoft.Sql/servers/sql-1",
+            "region": "westeurope",
+            "account_id": "00000000-0000-0000-0000-000000000001",
+            "attributes": {
+                "service_type": "SQL DATABASE",
+                "cost_amount": "3.20",
+                "currency": "USD",
+                "resource_group": "rg-data",
+            },
+            "tags": {"Tags": "team:data"},
+            "resource_created_at": JAN_1,
+            "resource_updated_at": JAN_2,
+        },
+        {
+            "entity_type": "billing_entry",
+            "entity_id": "/subscriptions/1/resourceGroups/rg-net/providers/Microsoft.Network/loadBalancers/lb-1",
+            "region": "eastus",
+            "account_id": "00000000-0000-0000-0000-000000000001",
+            "attributes": {
+                "service_type": "LOAD BALANCER",
+                "cost_amount": "0.60",
+                "currency": "USD",
+                "resource_group": "rg-net",
+            },
+            "tags": {},
+            "resource_created_at": JAN_1,
+            "resource_updated_at": JAN_2,
+        },
+    ],
+}
+
+
+@pytest.fixture
+def collector(monkeypatch, tmp_path):
+    """Collector writing raw-row shards under a temporary upload dir."""
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    return MetadataCollector()
+
+
+@pytest.mark.parametrize("provider", ["aws", "gcp", "azure"])
+def test_extracts_provider_exports(collector, monkeypatch, provider):
+    """Test records match the per-row extraction for each provider's export."""
+    monkeypatch.setattr(settings, "METADATA_STORE_RAW_ROWS", False)
+
+    records, info = collector.extract_metadata(
+        str(FIXTURES / f"{provider}_billing.csv"), "text/csv", user_id=1, job_id=7
+    )
+
+    assert [
+        {key: record[key] for key in EXPECTED_RECORDS[provider][0]}
+        for record in records
+    ] == EXPECTED_RECORDS[provider]
+    for record in records:
+        assert record["ingestion_job_id"] == 7
+        assert record["user_id"] == 1
+        assert record["provider"] == provider
+        assert record["source_path"] == "job_7"
+        assert record["raw_offset"] is None
+
+    assert info["format_detected"] == "csv"
+    assert info["records_extracted"] == len(EXPECTED_RECORDS[provider])
+    assert info["providers_detected"] == [provider]
+    assert sorted(info["entity_types"]) == sorted(
+        {record["entity_type"] for record in EXPECTED_RECORDS[provider]}
+    )
+    assert info["malformed_rows"] == 0
+
+
+def test_raw_offsets_point_at_source_rows(collector):
+    """Test each record's raw offset addresses its own row in the job's shard."""
+    path = str(FIXTURES / "aws_billing.csv")
+    records = collector.extract_csv_metadata(path, user_id=1, job_id=7)
+
+    shard = pq.read_table(collector.raw_shard_path(7))
+    # The row without a resource ID is kept in the shard but yields no record
+    assert shard.num_rows == 7
+    for record in records:
+        assert record["source_path"] == collector.raw_shard_path(7)
+        row = shard.slice(record["raw_offset"], 1).to_pylist()[0]
+        assert row["line_item_resource_id"].strip() == record["entity_id"]
+
+
+def test_wide_header_keeps_values_as_strings(collector, tmp_path):
+    """Test columns past the first 8 KiB of the header are not type-inferred."""
+    padding = [f"pad_column_{i:04d}" for i in range(1000)]
+    headers = ["line_item_resource_id", *padding, "line_item_usage_account_id", "line_item_blended_cost"]
+    row = ["i-1", *([""] * len(padding)), "001122334455", "1.50"]
+    path = tmp_path / "wide.csv"
+    path.write_text(",".join(headers) + "\n" + ",".join(row) + "\n")
+    assert len(",".join(headers)) > 8192
+
+    [record] = collector.extract_csv_metadata(str(path), user_id=1, job_id=7)
+
+    assert record["account_id"] == "001122334455"
+    assert record["attributes"]["cost_amount"] == "1.50"
+
+
+def test_invalid_utf8_is_replaced(collector, tmp_path):
+    """Test undecodable bytes are replaced rather than failing the file."""
+    path = tmp_path / "latin1.csv"
+    path.write_bytes(
+        b"line_item_resource_id,line_item_product_code,resourceTags/user:Owner\n"
+        b"i-1,AmazonEC2,Ren\xe9\n"
+        b"i-2,AmazonS3,\n"
+        b"i-3\xff,AmazonRDS,ops\n"
+        b"i-4,Amazon\xffVPC\n"
+        b"i-5,AWSLambda,dev\n"
+    )
+
+    records, info = collector.extract_metadata(str(path), "text/csv", user_id=1, job_id=7)
+
+    by_id = {record["entity_id"]: record for record in records}
+    assert sorted(by_id) == ["i-1", "i-2", "i-3\ufffd", "i-4", "i-5"]
+    assert by_id["i-1"]["tags"] == {"resourceTags/user:Owner": "Ren\ufffd"}
+    assert by_id["i-4"]["attributes"]["service_type"] == "AMAZON\ufffdVPC"
+    assert info["malformed_rows"] == 1
+
+
+def test_rows_of_wrong_width_are_kept_and_counted(collector, tmp_path):
+    """Test short rows get missing fields as None and long rows are truncated."""
+    path = tmp_path / "ragged.csv"
+    path.write_text(
+        "line_item_resource_id,line_item_product_code,line_item_blended_cost\n"
+        "i-1,AmazonS3\n"
+        "i-2,AmazonEC2,0.25\n"
+        "i-3,AmazonRDS,0.50,extra\n"
+    )
+
+    records, info = collector.extract_metadata(str(path), "text/csv", user_id=1, job_id=7)
+
+    by_id = {record["entity_id"]: record for record in records}
+    assert sorted(by_id) == ["i-1", "i-2", "i-3"]
+    assert by_id["i-1"]["attributes"] == {"service_type": "AMAZONS3", "currency": "USD"}
+    assert by_id["i-2"]["attributes"]["cost_amount"] == "0.25"
+    assert by_id["i-3"]["attributes"]["cost_amount"] == "0.50"
+    assert info["malformed_rows"] == 2
+
+
+def test_invalid_utf8_past_the_first_batch_is_replaced(collector, monkeypatch, tmp_path):
+    """Test bytes Arrow rejects mid-file don't repeat or lose earlier rows."""
+    monkeypatch.setattr("app.modules.metadata.collector.CSV_BLOCK_SIZE", 128)
+    rows = [f"i-{i},AmazonS3,0.{i}" for i in range(20)]
+    rows[15] = "i-15,Amazon\xffS3,0.15"
+    path = tmp_path / "late.csv"
+    path.write_bytes(
+        "line_item_resource_id,line_item_product_code,line_item_blended_cost\n".encode()
+        + "\n".join(rows).encode("latin-1")
+        + b"\n"
+    )
+
+    records, info = collector.extract_metadata(str(path), "text/csv", user_id=1, job_id=7)
+
+    assert [record["entity_id"] for record in records] == [f"i-{i}" for i in range(20)]
+    assert records[15]["attributes"]["service_type"] == "AMAZON�S3"
+    shard = pq.read_table(collector.raw_shard_path(7))
+    assert shard.column("line_item_resource_id").to_pylist() == [f"i-{i}" for i in range(20)]
+    assert info["malformed_rows"] == 0
+
+
+def test_spaces_after_delimiter_are_skipped(collector, tmp_path):
+    """Test files sniffed with skipinitialspace read as csv.DictReader read them."""
+    path = tmp_path / "spaced.csv"
+    path.write_text(
+        "line_item_resource_id, product_region_code, line_item_product_code, line_item_blended_cost\n"
+        'i-1, us-east-1, AmazonS3, "1.50"\n'
+        "i-2, us-west-2, AmazonEC2, 0.25\n"
+        "i-3, eu-west-1\n"
+    )
+
+    records, info = collector.extract_metadata(str(path), "text/csv", user_id=1, job_id=7)
+
+    by_id = {record["entity_id"]: record for record in records}
+    assert sorted(by_id) == ["i-1", "i-2", "i-3"]
+    assert by_id["i-1"]["region"] == "us-east-1"
+    assert by_id["i-1"]["entity_type"] == "storage_bucket"
+    assert by_id["i-1"]["attributes"]["service_type"] == "AMAZONS3"
+    assert by_id["i-1"]["attributes"]["cost_amount"] == "1.50"
+    assert by_id["i-2"]["entity_type"] == "compute_instance"
+    assert by_id["i-3"]["region"] == "eu-west-1"
+    assert info["malformed_rows"] == 1